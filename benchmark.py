@@ -0,0 +1,708 @@
+"""
+Benchmarks for the RA scraper, run against a local mock GraphQL server.
+
+Usage:
+    python benchmark.py concurrency [--venues 32] [--latency 0.2] [--workers 1 2 4 8 16]
+    python benchmark.py batching [--venues 256] [--workers 4] [--batch-sizes 1 5 10 25]
+    python benchmark.py ratelimit [--venues 100] [--server-rate 10] [--rate 4]
+    python benchmark.py hedging [--requests 400] [--slow-fraction 0.03] [--slow-latency 1.0] [--per-host 4]
+    python benchmark.py memory [--events 1000000]
+    python benchmark.py decode [--events 200000] [--chunk-size 65536]
+    python benchmark.py importtime [--modules ra_club_scraper load_db] [--max-ms 400]
+    python benchmark.py dbwrite [--venues 200] [--events-per-venue 50]
+    python benchmark.py formats [--events 200000]
+    python benchmark.py archive [--responses 2000] [--events-per-response 50]
+    python benchmark.py faults
+
+The mock server answers venue queries with synthetic events after a fixed
+delay, so wall-clock numbers reflect how well the scraper overlaps network waits.
+It can also be scripted to fail requests (error statuses, bodies cut short),
+which the faults check uses to exercise the retry and circuit breaker paths.
+"""
+
+import argparse
+import contextlib
+import csv
+import gc
+import json
+import os
+import random
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+
+import columnar
+import database
+import load_db
+import ra_client
+import response_archive
+import writers
+import ra_club_scraper
+from models import Event
+
+VENUE_RE = re.compile(r"(?:(\w+)\s*:\s*)?venue\(id:\s*\$(\w+)")
+EVENT_LIST_RE = re.compile(r"(?:(\w+)\s*:\s*)?events\(type:\s*(\w+)")
+
+# Retries allowed in the faults check
+FAULT_MAX_RETRIES = 3
+
+
+def make_events(venue_id: str, event_type: str, count: int, offset: int = 0) -> list:
+    """
+    Build `count` synthetic events shaped like RA's venue.events response,
+    starting at position `offset` of the venue's list.
+    """
+    base = 1 if event_type == "LATEST" else 5_000
+    events = []
+    for i in range(offset, offset + count):
+        event_id = str(int(venue_id) * 10_000 + base + i)
+        day = f"2026-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}"
+        events.append({
+            "id": event_id,
+            "title": f"Mock night {event_id}",
+            "date": f"{day}T00:00:00.000",
+            "startTime": f"{day}T22:00:00.000",
+            "endTime": f"{day}T23:59:00.000",
+            "contentUrl": f"/events/{event_id}",
+            "flyerFront": "",
+            "artists": [{"id": str(i), "name": f"Artist {i}"}],
+            "pick": None,
+        })
+    return events
+
+
+class MockGraphQLHandler(BaseHTTPRequestHandler):
+    """
+    Answers venue queries with synthetic data after `server.latency` seconds.
+    """
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment; otherwise delayed ACKs add ~40ms per keep-alive request
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        fault = self.server.next_fault()
+        if isinstance(fault, int):
+            self.send_error_body(fault, retry_after="0" if fault == 429 else None)
+            return
+        if isinstance(fault, tuple):
+            self.send_error_body(*fault)
+            return
+        if self.server.throttled():
+            self.send_error_body(429, retry_after="1")
+            return
+
+        latency = self.server.latency
+        if random.random() < self.server.slow_fraction:
+            latency = self.server.slow_latency
+        time.sleep(latency)
+
+        query = payload.get("query", "")
+        variables = payload.get("variables") or {}
+        limit = int(variables.get("limit") or 0)
+        offset = (int(variables.get("page") or 1) - 1) * limit
+        count = max(0, min(limit, self.server.events_per_venue - offset))
+        # Every venue gets one entry per (optionally aliased) events(type: ...) field
+        event_lists = dict.fromkeys(EVENT_LIST_RE.findall(query))
+
+        data = {}
+        for alias, variable in VENUE_RE.findall(query):
+            venue_id = str(variables.get(variable, "0"))
+            venue = {"id": venue_id, "name": f"Mock Venue {venue_id}", "address": "1 Mock St"}
+            for list_alias, event_type in event_lists:
+                venue[list_alias or "events"] = make_events(venue_id, event_type, count, offset)
+            data[alias or "venue"] = venue
+
+        body = json.dumps({"data": data}).encode()
+
+        with self.server.stats_lock:
+            self.server.requests_served += 1
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if fault == "cut":
+            # Promise the whole body, then hang up halfway through it
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def send_error_body(self, status: int, retry_after: str = None):
+        message = "Too many requests" if status == 429 else "Mock server error"
+        body = json.dumps({"errors": [{"message": message}]}).encode()
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header("Retry-After", retry_after)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockGraphQLServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 drops connections once many workers connect at once
+    request_queue_size = 128
+    # Requests/second accepted before answering 429 (None = unlimited)
+    rate_limit = None
+    # Share of requests answered after `slow_latency` instead of `latency`
+    slow_fraction = 0.0
+    slow_latency = 0.0
+
+    def throttled(self) -> bool:
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self.stats_lock:
+            while self.recent and self.recent[0] <= now - 1:
+                self.recent.popleft()
+            if len(self.recent) >= self.rate_limit:
+                self.throttled_count += 1
+                return True
+            self.recent.append(now)
+            return False
+
+    def next_fault(self):
+        """
+        Return the scripted fault for this request: an HTTP status to answer
+        with, a (status, Retry-After) pair, "cut" to break the body off, or
+        None for a normal response.
+        """
+        with self.stats_lock:
+            return self.faults.popleft() if self.faults else None
+
+
+def start_mock_server(latency: float = 0.2, events_per_venue: int = 20, rate_limit: float = None):
+    """
+    Start the mock GraphQL server on a free localhost port in a background thread.
+    Returns the server; call server.shutdown() when done.
+    """
+    server = MockGraphQLServer(("127.0.0.1", 0), MockGraphQLHandler)
+    server.latency = latency
+    server.events_per_venue = events_per_venue
+    server.rate_limit = rate_limit
+    server.recent = deque()
+    server.faults = deque()
+    server.throttled_count = 0
+    server.requests_served = 0
+    server.stats_lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_concurrency(args):
+    server = start_mock_server(latency=args.latency, events_per_venue=args.events_per_venue)
+    ra_client.GRAPHQL_URL = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    club_ids = list(range(100_000, 100_000 + args.venues))
+
+    print(f"{args.venues} venues, {args.latency:.3f}s mock latency per request")
+    print(f"{'workers':>8} {'seconds':>9} {'events':>8} {'speedup':>8} {'requests':>9} {'opened':>7} {'reused':>7}")
+    baseline = None
+    try:
+        for workers in args.workers:
+            # The mock server is a single host, so let the per-host cap follow the pool size
+            ra_client.configure(per_host=workers, rate=0)
+            ra_client.stats.reset()
+            start = time.perf_counter()
+            df = ra_club_scraper.fetch_many_club_events(
+                club_ids, include_past=args.include_past, max_pages=args.max_pages, workers=workers, verbose=False
+            )
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            stats = ra_client.stats
+            print(f"{workers:>8} {elapsed:>9.2f} {len(df):>8} {baseline / elapsed:>7.1f}x "
+                  f"{stats.requests:>9} {stats.connections_opened:>7} {stats.connections_reused:>7}")
+    finally:
+        server.shutdown()
+
+
+def bench_batching(args):
+    server = start_mock_server(latency=args.latency, events_per_venue=args.events_per_venue)
+    ra_client.GRAPHQL_URL = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    ra_client.configure(per_host=args.workers, rate=0)
+    club_ids = list(range(100_000, 100_000 + args.venues))
+
+    print(f"{args.venues} venues, {args.workers} workers, {args.latency:.3f}s mock latency per request")
+    print(f"{'batch':>8} {'seconds':>9} {'events':>8} {'requests':>9}")
+    try:
+        for batch_size in args.batch_sizes:
+            ra_client.stats.reset()
+            start = time.perf_counter()
+            df = ra_club_scraper.fetch_many_club_events(
+                club_ids, include_past=args.include_past, max_pages=args.max_pages, workers=args.workers,
+                verbose=False, batch_size=batch_size
+            )
+            elapsed = time.perf_counter() - start
+            print(f"{batch_size:>8} {elapsed:>9.2f} {len(df):>8} {ra_client.stats.requests:>9}")
+    finally:
+        server.shutdown()
+
+
+def bench_ratelimit(args):
+    server = start_mock_server(latency=args.latency, rate_limit=args.server_rate)
+    ra_client.GRAPHQL_URL = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    ra_client.configure(per_host=args.workers, rate=args.rate, max_rate=args.max_rate)
+    ra_client.stats.reset()
+    club_ids = list(range(100_000, 100_000 + args.venues))
+
+    print(f"{args.venues} venues, {args.workers} workers, server allows {args.server_rate} req/s")
+    try:
+        start = time.perf_counter()
+        df = ra_club_scraper.fetch_many_club_events(club_ids, max_pages=1, workers=args.workers, verbose=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    stats = ra_client.stats
+    print(f"{len(df)} events in {elapsed:.2f}s ({stats.requests / elapsed:.1f} req/s sent)")
+    print(f"{stats.requests} requests, {server.throttled_count} answered 429, {stats.retries} retries")
+    print(f"Limiter settled at {ra_client.get_limiter().rate:.1f} req/s")
+
+
+def bench_hedging(args):
+    server = start_mock_server(latency=args.latency)
+    server.slow_fraction = args.slow_fraction
+    server.slow_latency = args.slow_latency
+    ra_client.GRAPHQL_URL = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+
+    def timed_fetch(club_id):
+        start = time.perf_counter()
+        ra_club_scraper.get_club_events(club_id, limit=10)
+        return time.perf_counter() - start
+
+    print(f"{args.requests} requests, {args.slow_fraction:.0%} answered after {args.slow_latency}s "
+          f"instead of {args.latency}s")
+    print(f"{'hedge':>6} {'seconds':>9} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7} {'hedged':>7} {'sent':>7}")
+    try:
+        for hedge in (False, True):
+            random.seed(1)
+            ra_client.configure(per_host=args.per_host, rate=0, hedge=hedge, workers=args.workers)
+            ra_client.latencies = ra_client.LatencyTracker()
+            ra_client.stats.reset()
+            # Warm up the latency tracker so hedging has a p95 to work with
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(timed_fetch, range(2 * ra_client.HEDGE_MIN_SAMPLES)))
+            ra_client.stats.reset()
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                samples = sorted(executor.map(timed_fetch, range(args.requests)))
+            elapsed = time.perf_counter() - start
+
+            def pct(q):
+                return samples[min(len(samples) - 1, int(q * len(samples)))]
+            print(f"{str(hedge):>6} {elapsed:>9.2f} {pct(0.5):>7.3f} {pct(0.95):>7.3f} {pct(0.99):>7.3f} "
+                  f"{samples[-1]:>7.3f} {ra_client.stats.hedged:>7} {ra_client.stats.requests:>7}")
+    finally:
+        server.shutdown()
+
+
+# (scenario, faults scripted for its first requests, expected outcome)
+FAULT_SCENARIOS = [
+    ("5xx opens the circuit, then 429 on the trial", [500, 500, 429], "ok"),
+    ("body cut short once", ["cut"], "ok"),
+    ("body cut short on every attempt", ["cut"] * (FAULT_MAX_RETRIES + 1), "TransferError"),
+    ("429 asking for an hour's wait", [(429, "3600")], "HTTPError"),
+]
+
+
+def bench_faults(args):
+    server = start_mock_server(latency=0)
+    ra_client.GRAPHQL_URL = f"http://127.0.0.1:{server.server_address[1]}/graphql"
+
+    def fetch(club_id):
+        try:
+            list(ra_club_scraper.iter_list_pages(club_id, "upcoming", 1, 1))
+        except (ra_client.TransferError, ra_client.CircuitOpenError, requests.HTTPError) as e:
+            return type(e).__name__
+        return "ok"
+
+    # Each scenario is followed by a clean request, which must get through:
+    # a failure must never leave the breaker (or a host slot) stuck
+    print(f"{'scenario':<46} {'result':>16} {'requests':>9} {'breaker':>10} {'then':>6}")
+    failed = []
+    try:
+        for i, (name, faults, expected) in enumerate(FAULT_SCENARIOS, start=1):
+            # A fresh breaker; no cooldown so the trial request follows right away
+            ra_client.configure(rate=0, max_retries=FAULT_MAX_RETRIES, breaker_threshold=2,
+                                breaker_cooldown=0, hedge=False)
+            server.faults.extend(faults)
+            ra_client.stats.reset()
+            result = fetch(i)
+            requests_sent = ra_client.stats.requests
+            state = ra_client.get_breaker().state
+            after = fetch(i)
+            print(f"{name:<46} {result:>16} {requests_sent:>9} {state:>10} {after:>6}")
+            if result != expected or after != "ok":
+                failed.append(name)
+    finally:
+        server.shutdown()
+    if failed:
+        print(f"Unexpected outcome: {', '.join(failed)}")
+        sys.exit(1)
+
+
+def bench_memory(args):
+    print(f"Building synthetic response with {args.events:,} events...")
+    response = {"data": {"venue": {
+        "id": "1", "name": "Mock Venue 1", "address": "1 Mock St",
+        "events": make_events("1", "LATEST", args.events),
+    }}}
+
+    def list_path():
+        df = ra_club_scraper.events_frame(ra_club_scraper.parse_events(response))
+        df.to_csv(os.devnull, index=False)
+
+    def streaming_path():
+        with open(os.devnull, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(Event.FIELDS)
+            for event in ra_club_scraper.iter_events(response):
+                writer.writerow(event.as_row())
+
+    # The response itself is allocated before tracing starts, so peaks only
+    # count what parsing and writing add on top of it
+    print(f"{'path':>22} {'seconds':>9} {'peak MB':>9}")
+    for name, run in (("parse_events+DataFrame", list_path), ("iter_events+csv", streaming_path)):
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>22} {elapsed:>9.2f} {peak / 1024 / 1024:>9.1f}")
+
+
+def bench_decode(args):
+    print(f"Building synthetic response body with {args.events:,} events...")
+    body = json.dumps({"data": {"venue": {
+        "id": "1", "name": "Mock Venue 1", "address": "1 Mock St",
+        "events": make_events("1", "LATEST", args.events),
+    }}}).encode()
+    print(f"Body is {len(body) / 1024 / 1024:.1f} MB, read in {args.chunk_size:,} byte chunks")
+
+    def chunks():
+        for start in range(0, len(body), args.chunk_size):
+            yield body[start:start + args.chunk_size]
+
+    def count(events):
+        return sum(1 for _ in events)
+
+    def whole_body():
+        # What post_graphql does: join the chunks, then decode the whole tree
+        return count(ra_club_scraper.iter_events(ra_client.loads(b"".join(chunks()))))
+
+    def streamed():
+        return count(ra_club_scraper.iter_events_stream(chunks()))
+
+    paths = [("loads+iter_events", whole_body), ("iter_events_stream", streamed)]
+
+    # The body is allocated before tracing starts, as if it were still on the wire
+    print(f"{'path':>22} {'seconds':>9} {'peak MB':>9} {'events':>9}")
+    for name, run in paths:
+        gc.collect()
+        tracemalloc.start()
+        start = time.perf_counter()
+        events = run()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>22} {elapsed:>9.2f} {peak / 1024 / 1024:>9.1f} {events:>9,}")
+
+
+def import_time(module: str, runs: int = 5):
+    """
+    Best-of-`runs` cumulative import time (ms) of a module in a fresh interpreter,
+    from `python -X importtime`, plus whether pandas got imported along the way.
+    """
+    best = None
+    pandas_loaded = False
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        # Lines look like "import time:  self [us] | cumulative | imported package"
+        for line in result.stderr.splitlines():
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) != 3 or not fields[1].isdigit():
+                continue
+            if fields[2] == "pandas":
+                pandas_loaded = True
+            if fields[2] == module:
+                elapsed = int(fields[1]) / 1000
+                best = elapsed if best is None else min(best, elapsed)
+    return best, pandas_loaded
+
+
+def bench_importtime(args):
+    print(f"{'module':>18} {'import ms':>10} {'pandas':>7}")
+    too_slow = []
+    for module in args.modules:
+        elapsed, pandas_loaded = import_time(module, args.runs)
+        print(f"{module:>18} {elapsed:>10.1f} {'yes' if pandas_loaded else 'no':>7}")
+        if args.max_ms and module != "pandas" and elapsed > args.max_ms:
+            too_slow.append(module)
+    if too_slow:
+        print(f"Import time over {args.max_ms} ms: {', '.join(too_slow)}")
+        sys.exit(1)
+
+
+def bench_dbwrite(args):
+    venues = {}
+    for v in range(1, args.venues + 1):
+        response = {"data": {"venue": {
+            "id": str(v), "name": f"Mock Venue {v}", "address": f"{v} Mock St",
+            "events": make_events(str(v), "LATEST", args.events_per_venue),
+        }}}
+        venues[f"Mock Venue {v}"] = ra_club_scraper.parse_events(response)
+    total = args.venues * args.events_per_venue
+    print(f"{args.venues} venues x {args.events_per_venue} events, one save_events call per venue")
+
+    tuned_pragmas = dict(database.PRAGMAS)
+
+    def save_all(db_path, fresh_connections, grouped):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            _save_all(db_path, fresh_connections, grouped)
+
+    def _save_all(db_path, fresh_connections, grouped):
+        if grouped:
+            with database.batch(db_path):
+                for name, events in venues.items():
+                    database.save_events(events, db_path, name)
+        else:
+            for name, events in venues.items():
+                database.save_events(events, db_path, name)
+                if fresh_connections:
+                    database.close_connections()
+
+    paths = (
+        # Connection per call with SQLite's defaults, as save_events used to do
+        ("fresh connection, defaults", {"recursive_triggers": "ON"}, True, False),
+        ("shared connection, tuned", tuned_pragmas, False, False),
+        ("shared, one transaction", tuned_pragmas, False, True),
+    )
+    print(f"{'path':>28} {'seconds':>9} {'events/s':>10} {'rerun s':>9}")
+    for name, pragmas, fresh, grouped in paths:
+        workdir = tempfile.mkdtemp()
+        db_path = os.path.join(workdir, "events.db")
+        database.PRAGMAS = pragmas
+        try:
+            start = time.perf_counter()
+            save_all(db_path, fresh, grouped)
+            elapsed = time.perf_counter() - start
+            # Second run: everything is unchanged, so this is the refresh cost
+            start = time.perf_counter()
+            save_all(db_path, fresh, grouped)
+            rerun = time.perf_counter() - start
+        finally:
+            database.close_connections()
+            database.PRAGMAS = tuned_pragmas
+            shutil.rmtree(workdir)
+        print(f"{name:>28} {elapsed:>9.2f} {total / elapsed:>10,.0f} {rerun:>9.2f}")
+
+
+def bench_formats(args):
+    events = []
+    for v in range(1, args.venues + 1):
+        response = {"data": {"venue": {
+            "id": str(v), "name": f"Mock Venue {v}", "address": f"{v} Mock St",
+            "events": make_events(str(v), "LATEST", args.events // args.venues),
+        }}}
+        events += ra_club_scraper.parse_events(response)
+    print(f"{len(events):,} events across {args.venues} venues")
+
+    formats = [".csv", ".json", ".jsonl"]
+    try:
+        columnar._pyarrow()
+        formats += [".parquet", ".feather"]
+    except ImportError as e:
+        print(f"Skipping Parquet/Feather: {e}")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        print(f"{'format':>9} {'MB':>8} {'write s':>9} {'reload s':>9} {'pandas s':>9}")
+        for extension in formats:
+            path = os.path.join(workdir, f"events{extension}")
+            start = time.perf_counter()
+            writers.write_events(events, path)
+            write_seconds = time.perf_counter() - start
+
+            # What load_db does with the file: read every row back as a dict
+            start = time.perf_counter()
+            rows = sum(1 for _ in load_db.read_rows(path))
+            reload_seconds = time.perf_counter() - start
+            assert rows == len(events)
+
+            # What an analytics job does: load it into a DataFrame
+            start = time.perf_counter()
+            if extension == ".csv":
+                pd.read_csv(path)
+            elif extension == ".json":
+                pd.read_json(path)
+            elif extension == ".jsonl":
+                pd.read_json(path, lines=True)
+            elif extension == ".parquet":
+                pd.read_parquet(path)
+            else:
+                pd.read_feather(path)
+            pandas_seconds = time.perf_counter() - start
+
+            size = os.path.getsize(path) / 1024 / 1024
+            print(f"{extension:>9} {size:>8.1f} {write_seconds:>9.2f} {reload_seconds:>9.2f} {pandas_seconds:>9.2f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+def bench_archive(args):
+    payload = {"query": "query GET_VENUE_UPCOMING($id: ID!) { venue(id: $id) { id } }"}
+    bodies = []
+    for v in range(1, args.responses + 1):
+        bodies.append(json.dumps({"data": {"venue": {
+            "id": str(v), "name": f"Mock Venue {v}", "address": f"{v} Mock St",
+            "events": make_events(str(v), "LATEST", args.events_per_response),
+        }}}).encode())
+    raw_size = sum(len(body) for body in bodies) / 1024 / 1024
+    print(f"{len(bodies):,} responses, {raw_size:.1f} MB of JSON")
+
+    workdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(workdir, "responses.gz")
+        start = time.perf_counter()
+        archive = response_archive.ResponseArchive(path)
+        for v, body in enumerate(bodies, 1):
+            archive.add(dict(payload, variables={"id": str(v)}), body)
+        archive.close()
+        write_seconds = time.perf_counter() - start
+        print(f"Archived to {os.path.getsize(path) / 1024 / 1024:.1f} MB in {write_seconds:.2f}s")
+
+        start = time.perf_counter()
+        records = sum(1 for _ in response_archive.iter_records(path))
+        read_seconds = time.perf_counter() - start
+        assert records == len(bodies)
+        print(f"Read back:  {read_seconds:.2f}s ({raw_size / read_seconds:.0f} MB/s of JSON)")
+
+        start = time.perf_counter()
+        events = sum(1 for _ in ra_club_scraper.iter_archived_events(path, verbose=False))
+        replay_seconds = time.perf_counter() - start
+        print(f"Replay:     {replay_seconds:.2f}s ({events:,} events, {events / replay_seconds:,.0f} events/s)")
+    finally:
+        shutil.rmtree(workdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RA scraper against a local mock server")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    concurrency = subparsers.add_parser("concurrency", help="Wall-clock time vs. worker count")
+    concurrency.add_argument("--venues", type=int, default=32, help="Number of venues to fetch (default: 32)")
+    concurrency.add_argument("--latency", type=float, default=0.2, help="Mock latency in seconds (default: 0.2)")
+    concurrency.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16],
+                             help="Worker counts to compare (default: 1 2 4 8 16)")
+    concurrency.add_argument("--include-past", action="store_true", help="Also fetch past events")
+    concurrency.add_argument("--events-per-venue", type=int, default=20,
+                             help="Events in each mock venue list (default: 20)")
+    concurrency.add_argument("--max-pages", type=int, default=10, help="Pages fetched per list (default: 10)")
+    concurrency.set_defaults(func=bench_concurrency)
+
+    batching = subparsers.add_parser("batching", help="Request count and time vs. venues per request")
+    batching.add_argument("--venues", type=int, default=256, help="Number of venues to fetch (default: 256)")
+    batching.add_argument("--latency", type=float, default=0.2, help="Mock latency in seconds (default: 0.2)")
+    batching.add_argument("--workers", type=int, default=4, help="Concurrent requests (default: 4)")
+    batching.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 5, 10, 25],
+                          help="Initial batch sizes to compare (default: 1 5 10 25)")
+    batching.add_argument("--include-past", action="store_true", help="Also fetch past events")
+    batching.add_argument("--events-per-venue", type=int, default=20,
+                          help="Events in each mock venue list (default: 20)")
+    batching.add_argument("--max-pages", type=int, default=10, help="Pages fetched per list (default: 10)")
+    batching.set_defaults(func=bench_batching)
+
+    ratelimit = subparsers.add_parser("ratelimit", help="Adaptive rate limiting against a throttling server")
+    ratelimit.add_argument("--venues", type=int, default=100, help="Number of venues to fetch (default: 100)")
+    ratelimit.add_argument("--latency", type=float, default=0.02, help="Mock latency in seconds (default: 0.02)")
+    ratelimit.add_argument("--workers", type=int, default=8, help="Concurrent requests (default: 8)")
+    ratelimit.add_argument("--server-rate", type=float, default=10,
+                           help="Requests/second the mock server accepts before answering 429 (default: 10)")
+    ratelimit.add_argument("--rate", type=float, default=ra_client.DEFAULT_RATE,
+                           help=f"Starting client rate (default: {ra_client.DEFAULT_RATE})")
+    ratelimit.add_argument("--max-rate", type=float, default=40, help="Client rate ceiling (default: 40)")
+    ratelimit.set_defaults(func=bench_ratelimit)
+
+    hedging = subparsers.add_parser("hedging", help="Tail latency with and without hedged requests")
+    hedging.add_argument("--requests", type=int, default=400, help="Number of requests (default: 400)")
+    hedging.add_argument("--workers", type=int, default=8, help="Concurrent requests (default: 8)")
+    hedging.add_argument("--per-host", type=int, default=ra_client.DEFAULT_PER_HOST_LIMIT,
+                         help=f"Per-host request limit, as in the scraper (default: {ra_client.DEFAULT_PER_HOST_LIMIT})")
+    hedging.add_argument("--latency", type=float, default=0.02, help="Normal mock latency (default: 0.02)")
+    hedging.add_argument("--slow-fraction", type=float, default=0.03,
+                         help="Share of requests answered slowly (default: 0.03)")
+    hedging.add_argument("--slow-latency", type=float, default=1.0, help="Slow mock latency (default: 1.0)")
+    hedging.set_defaults(func=bench_hedging)
+
+    memory = subparsers.add_parser("memory", help="Peak memory of list vs. streaming parsing")
+    memory.add_argument("--events", type=int, default=1_000_000,
+                        help="Events in the synthetic response (default: 1000000)")
+    memory.set_defaults(func=bench_memory)
+
+    decode = subparsers.add_parser("decode", help="Peak memory of whole-body vs. incremental JSON decoding")
+    decode.add_argument("--events", type=int, default=200_000,
+                        help="Events in the synthetic response body (default: 200000)")
+    decode.add_argument("--chunk-size", type=int, default=ra_client.STREAM_CHUNK_SIZE,
+                        help=f"Bytes per body chunk (default: {ra_client.STREAM_CHUNK_SIZE})")
+    decode.set_defaults(func=bench_decode)
+
+    importtime = subparsers.add_parser("importtime", help="Import time of the command line modules")
+    importtime.add_argument("--modules", nargs="+", default=["ra_club_scraper", "load_db", "database", "pandas"],
+                            help="Modules to import (default: ra_club_scraper load_db database pandas)")
+    importtime.add_argument("--runs", type=int, default=5, help="Best of this many runs (default: 5)")
+    importtime.add_argument("--max-ms", type=float, default=None,
+                            help="Exit with status 1 if a module (other than pandas) takes longer")
+    importtime.set_defaults(func=bench_importtime)
+
+    dbwrite = subparsers.add_parser("dbwrite", help="SQLite save throughput with and without connection tuning")
+    dbwrite.add_argument("--venues", type=int, default=200, help="Number of venues saved (default: 200)")
+    dbwrite.add_argument("--events-per-venue", type=int, default=50,
+                         help="Events saved per venue (default: 50)")
+    dbwrite.set_defaults(func=bench_dbwrite)
+
+    formats = subparsers.add_parser("formats", help="File size and load time of the output formats")
+    formats.add_argument("--events", type=int, default=200_000, help="Events written (default: 200000)")
+    formats.add_argument("--venues", type=int, default=50, help="Venues they are spread over (default: 50)")
+    formats.set_defaults(func=bench_formats)
+
+    archive = subparsers.add_parser("archive", help="Size and replay speed of the response archive")
+    archive.add_argument("--responses", type=int, default=2000, help="Responses archived (default: 2000)")
+    archive.add_argument("--events-per-response", type=int, default=50,
+                         help="Events per response (default: 50)")
+    archive.set_defaults(func=bench_archive)
+
+    faults = subparsers.add_parser("faults", help="Retries and the circuit breaker against scripted failures")
+    faults.set_defaults(func=bench_faults)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
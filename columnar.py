@@ -0,0 +1,181 @@
+"""
+Columnar output (Parquet and Arrow IPC / Feather) for Event records.
+
+Dates and start/end times are stored as typed millisecond timestamps, and
+the venue name, address and id as dictionary-encoded columns, so files are
+small and load straight into pandas/Arrow-based tools without re-parsing
+text. Artists are kept as a list of {id, name} structs, with the names
+dictionary-encoded too since the same residents play week after week.
+
+Requires the optional `pyarrow` package, which is only imported when one of
+these functions is called.
+"""
+
+import json
+from datetime import datetime
+
+# Rows converted to Arrow at a time when reading
+READ_BATCH_SIZE = 64 * 1024
+
+PARQUET_EXTENSIONS = (".parquet",)
+FEATHER_EXTENSIONS = (".feather", ".arrow")
+EXTENSIONS = PARQUET_EXTENSIONS + FEATHER_EXTENSIONS
+
+TIMESTAMP_COLUMNS = ("date", "start_time", "end_time")
+DICTIONARY_COLUMNS = ("venue", "venue_address", "venue_id")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("Parquet/Feather support needs pyarrow: pip install pyarrow") from None
+    return pyarrow
+
+
+def require():
+    """
+    Raise ImportError with an install hint unless pyarrow is available, so
+    callers can check before doing work whose output needs it.
+    """
+    _pyarrow()
+
+
+def _timestamp(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def _string_dictionary():
+    pa = _pyarrow()
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def schema():
+    pa = _pyarrow()
+    fields = []
+    for name in ("event_id", "title", "date", "start_time", "end_time", "venue", "venue_address",
+                 "performers", "description", "url", "flyer_url"):
+        if name in TIMESTAMP_COLUMNS:
+            fields.append(pa.field(name, pa.timestamp("ms")))
+        elif name in DICTIONARY_COLUMNS:
+            fields.append(pa.field(name, _string_dictionary()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    artist = pa.struct([("id", pa.string()), ("name", _string_dictionary())])
+    fields.append(pa.field("artists", pa.list_(artist)))
+    fields.append(pa.field("venue_id", _string_dictionary()))
+    return pa.schema(fields)
+
+
+def _artists_array(artist_lists, type):
+    """
+    Build the artists column from the events' (id, name) pairs. The list is
+    assembled from flat id/name children so the names can share one dictionary.
+    """
+    pa = _pyarrow()
+    offsets = [0]
+    ids = []
+    names = []
+    for artists in artist_lists:
+        for artist_id, name in artists:
+            ids.append(artist_id)
+            names.append(name)
+        offsets.append(len(ids))
+    struct = pa.StructArray.from_arrays(
+        [pa.array(ids, type=pa.string()), pa.array(names, type=pa.string()).dictionary_encode()],
+        fields=list(type.value_type),
+    )
+    return pa.ListArray.from_arrays(pa.array(offsets, type=pa.int32()), struct, type=type)
+
+
+def events_table(events):
+    """
+    Build a pyarrow Table (see schema) from Event records.
+    """
+    pa = _pyarrow()
+    columns = {
+        "event_id": [], "title": [], "date": [], "start_time": [], "end_time": [],
+        "venue": [], "venue_address": [], "performers": [], "description": [],
+        "url": [], "flyer_url": [], "artists": [], "venue_id": [],
+    }
+    for event in events:
+        columns["event_id"].append(event.event_id)
+        columns["title"].append(event.title)
+        columns["date"].append(_timestamp(event.date))
+        columns["start_time"].append(_timestamp(event.start_time))
+        columns["end_time"].append(_timestamp(event.end_time))
+        columns["venue"].append(event.venue)
+        columns["venue_address"].append(event.venue_address)
+        columns["performers"].append(event.performers)
+        columns["description"].append(event.description)
+        columns["url"].append(event.url)
+        columns["flyer_url"].append(event.flyer_url)
+        columns["artists"].append(event.artists)
+        columns["venue_id"].append(event.venue_id)
+
+    arrays = []
+    for field in schema():
+        if field.name == "artists":
+            arrays.append(_artists_array(columns["artists"], field.type))
+        elif pa.types.is_dictionary(field.type):
+            # One dictionary for the whole column
+            arrays.append(pa.array(columns[field.name], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema())
+
+
+def write_parquet(events, path: str) -> int:
+    _pyarrow()
+    import pyarrow.parquet as pq
+    table = events_table(events)
+    pq.write_table(table, path, compression="zstd")
+    return table.num_rows
+
+
+def write_feather(events, path: str) -> int:
+    _pyarrow()
+    import pyarrow.feather as feather
+    table = events_table(events)
+    feather.write_feather(table, path, compression="zstd")
+    return table.num_rows
+
+
+def _iter_batches(path: str):
+    pa = _pyarrow()
+    if path.endswith(PARQUET_EXTENSIONS):
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(path).iter_batches(batch_size=READ_BATCH_SIZE)
+    else:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i)
+
+
+def _column_values(column) -> list:
+    pa = _pyarrow()
+    import pyarrow.compute as pc
+    if pa.types.is_timestamp(column.type):
+        # Back to RA's own format, e.g. 2024-05-01T23:00:00.000, so reloaded
+        # events hash the same as freshly scraped ones
+        column = pc.replace_substring(column.cast(pa.string()), " ", "T")
+    elif pa.types.is_dictionary(column.type):
+        column = column.cast(pa.string())
+    values = column.to_pylist()
+    if pa.types.is_list(column.type):
+        values = [json.dumps(value) if value is not None else None for value in values]
+    return values
+
+
+def iter_rows(path: str):
+    """
+    Yield the events of a Parquet or Feather file as dicts in the same shape
+    as CSV/JSON rows: ISO date strings and artists as a JSON string.
+    Columns are converted a batch at a time in Arrow, not value by value.
+    """
+    for batch in _iter_batches(path):
+        names = batch.schema.names
+        columns = [_column_values(batch.column(i)) for i in range(len(names))]
+        for values in zip(*columns):
+            yield dict(zip(names, values))
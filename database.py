@@ -1,8 +1,21 @@
+import atexit
+import hashlib
+import json
 import sqlite3
-import pandas as pd
+import os
 import re
+import threading
+from contextlib import contextmanager
 from datetime import datetime
 
+# Columns of a flattened event record (CSV/JSON output and the per-venue views).
+# venue_id is RA's id for the venue, stored as venues.ra_id.
+EVENT_COLUMNS = [
+    'event_id', 'title', 'date', 'start_time', 'end_time',
+    'venue', 'venue_address', 'performers', 'description',
+    'url', 'flyer_url', 'artists', 'venue_id'
+]
+
 def sanitize_table_name(venue_name: str) -> str:
     """
     Sanitize venue name to create a valid and clean SQL table name.
@@ -18,73 +31,680 @@ def sanitize_table_name(venue_name: str) -> str:
     
     return f"events_{name}"
 
-def save_events(pd_events: pd.DataFrame, db_path: str, venue_name: str):
+def event_rows(events) -> list:
     """
-    Save events DataFrame to a SQLite database.
-    Creates a new table for the venue if it doesn't exist.
+    Turn events into value lists in EVENT_COLUMNS order.
+    Accepts a pandas DataFrame, Event records or dicts (e.g. csv.DictReader rows).
+    Empty strings and NaN become NULL, as they do when pandas reads a CSV.
     """
-    if pd_events.empty:
-        print("No events to save to database.")
+    if hasattr(events, "to_dict"):
+        events = events.to_dict(orient='records')
+    rows = []
+    for event in events:
+        if hasattr(event, "as_row"):
+            values = list(event.as_row())
+        else:
+            values = [event.get(col) for col in EVENT_COLUMNS]
+        values = [None if v == "" or v != v else v for v in values]
+        # event_id and venue_id are TEXT; pandas reads them back from CSV as ints
+        for index in (0, VENUE_ID_INDEX):
+            if values[index] is not None:
+                values[index] = str(values[index])
+        rows.append(values)
+    return rows
+
+VENUE_ID_INDEX = EVENT_COLUMNS.index('venue_id')
+
+# Columns stored in the events table itself; venue, venue_address and
+# venue_id live in venues, artists in artists/event_artists
+STORED_COLUMNS = [col for col in EVENT_COLUMNS if col not in ('venue', 'venue_address', 'artists', 'venue_id')]
+
+# Events written per transaction when streaming into the database
+DEFAULT_BATCH_SIZE = 500
+
+# One row per venue, and all events in a single table keyed to it. The indexes
+# cover date-range queries across venues, per-venue listings and time-of-day lookups.
+# Venues are identified by RA's venue id (ra_id, unique; see ensure_schema);
+# the slug only names the venue's compatibility view. Venues loaded from old
+# files without venue ids have no ra_id and are matched by slug instead.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS venues (
+    venue_id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    address TEXT,
+    ra_id TEXT
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    event_id TEXT PRIMARY KEY,
+    venue_id INTEGER NOT NULL REFERENCES venues (venue_id),
+    title TEXT,
+    date TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    performers TEXT,
+    description TEXT,
+    url TEXT,
+    flyer_url TEXT,
+    updated_at TIMESTAMP,
+    content_hash TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_events_date ON events (date);
+CREATE INDEX IF NOT EXISTS idx_events_venue_date ON events (venue_id, date);
+CREATE INDEX IF NOT EXISTS idx_events_start_time ON events (start_time);
+
+CREATE TABLE IF NOT EXISTS artists (
+    artist_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS event_artists (
+    event_id TEXT NOT NULL REFERENCES events (event_id),
+    artist_id TEXT NOT NULL REFERENCES artists (artist_id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (event_id, artist_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_artists_name ON artists (name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_event_artists_artist ON event_artists (artist_id, event_id);
+"""
+
+# Full-text index over the searchable event columns. It is an external-content
+# table (the text lives only in events) kept in sync by triggers.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS fts_events USING fts5(
+    title, performers, description,
+    content='events', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS fts_events_insert AFTER INSERT ON events BEGIN
+    INSERT INTO fts_events (rowid, title, performers, description)
+    VALUES (new.rowid, new.title, new.performers, new.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS fts_events_delete AFTER DELETE ON events BEGIN
+    INSERT INTO fts_events (fts_events, rowid, title, performers, description)
+    VALUES ('delete', old.rowid, old.title, old.performers, old.description);
+END;
+
+CREATE TRIGGER IF NOT EXISTS fts_events_update AFTER UPDATE ON events BEGIN
+    INSERT INTO fts_events (fts_events, rowid, title, performers, description)
+    VALUES ('delete', old.rowid, old.title, old.performers, old.description);
+    INSERT INTO fts_events (rowid, title, performers, description)
+    VALUES (new.rowid, new.title, new.performers, new.description);
+END;
+"""
+
+# bm25 column weights for title, performers and description
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Seconds a connection waits for another writer's lock before giving up
+BUSY_TIMEOUT = 30
+
+# Applied to every connection. WAL lets readers (search, incremental
+# high-water marks) run while a scrape is writing, and makes
+# synchronous=NORMAL safe: a power loss can drop the last commits but never
+# corrupts the database.
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64 * 1024,          # 64 MB page cache (negative means KiB)
+    "mmap_size": 256 * 1024 * 1024,    # read through a 256 MB memory map
+    "temp_store": "MEMORY",
+    # INSERT OR REPLACE only fires the delete trigger (which keeps the
+    # full-text index in sync) with recursive triggers on
+    "recursive_triggers": "ON",
+}
+
+# Open connections by (thread id, absolute path), see get_connection
+_connections = {}
+_connections_lock = threading.Lock()
+
+def connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open a new connection to the events database with PRAGMAS applied,
+    creating the schema and migrating old per-venue tables if needed.
+    Most callers want the shared connection from get_connection instead.
+    """
+    # check_same_thread is off only so close_connections can close every
+    # thread's connection at exit; each connection is used by one thread
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    try:
+        for name, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        ensure_schema(conn)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+def get_connection(db_path: str) -> sqlite3.Connection:
+    """
+    Return this thread's connection to a database, opening it on first use.
+    Connections stay open (keeping their page cache and schema checks) until
+    close_connections is called or the interpreter exits.
+    """
+    key = (threading.get_ident(), os.path.abspath(db_path))
+    with _connections_lock:
+        conn = _connections.get(key)
+    if conn is None:
+        conn = connect(db_path)
+        with _connections_lock:
+            _connections[key] = conn
+    return conn
+
+def close_connections():
+    """
+    Close all shared connections (the last one to close checkpoints the WAL).
+    """
+    with _connections_lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for conn in connections:
+        conn.close()
+
+atexit.register(close_connections)
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """
+    Run a block in one write transaction. BEGIN IMMEDIATE takes the write lock
+    up front (waiting up to BUSY_TIMEOUT for other writers) rather than failing
+    halfway through. Nested uses join the outer transaction, so several saves
+    can be grouped into one commit.
+    """
+    if conn.in_transaction:
+        yield conn
         return
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
 
-    table_name = sanitize_table_name(venue_name)
+@contextmanager
+def batch(db_path: str):
+    """
+    Group several save_events calls into a single transaction:
     
-    conn = sqlite3.connect(db_path)
+        with database.batch("events.db"):
+            for venue_name, events in venues.items():
+                database.save_events(events, "events.db", venue_name)
+    """
+    with transaction(get_connection(db_path)) as conn:
+        yield conn
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript(SCHEMA)
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(events)")]
+    if 'content_hash' not in columns:
+        # Databases created before change detection; rows without a hash
+        # are rewritten once on their next save
+        conn.execute("ALTER TABLE events ADD COLUMN content_hash TEXT")
+        conn.commit()
+    if 'ra_id' not in [row[1] for row in conn.execute("PRAGMA table_info(venues)")]:
+        # Databases created before venues were keyed by RA's id; existing
+        # venues pick up their id the next time they are saved (get_venue_id)
+        conn.execute("ALTER TABLE venues ADD COLUMN ra_id TEXT")
+        conn.commit()
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_venues_ra_id ON venues (ra_id)")
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'fts_events'"
+    ).fetchone() is not None
     try:
-        # Create table if it doesn't exist
-        # We manually define schema to ensure types and primary key
-        # SQLite doesn't strictly enforce types, but it's good practice
-        create_table_sql = f"""
-        CREATE TABLE IF NOT EXISTS {table_name} (
-            event_id TEXT PRIMARY KEY,
-            title TEXT,
-            date TEXT,
-            start_time TEXT,
-            end_time TEXT,
-            venue TEXT,
-            venue_address TEXT,
-            performers TEXT,
-            description TEXT,
-            url TEXT,
-            flyer_url TEXT,
-            updated_at TIMESTAMP
+        conn.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        # SQLite built without FTS5: everything but search_events still works
+        if "fts5" not in str(e):
+            raise
+    else:
+        if not has_fts:
+            # Index events stored before the full-text table existed
+            conn.execute("INSERT INTO fts_events (fts_events) VALUES ('rebuild')")
+            conn.commit()
+    migrate_venue_tables(conn)
+
+def venue_slug(venue_name: str) -> str:
+    """
+    Short identifier for a venue, e.g. "Public Records" -> "public_records".
+    Also the suffix of the venue's compatibility view (see sanitize_table_name).
+    """
+    return sanitize_table_name(venue_name or "")[len("events_"):] or "unknown_venue"
+
+def _free_slug(conn: sqlite3.Connection, venue_name: str, ra_id: str) -> str:
+    """
+    Slug for a new venue with an RA id. Names that differ only in punctuation
+    (or have no Latin letters at all) would share a slug, so the id is added
+    to keep each venue's view separate.
+    """
+    id_part = re.sub(r'[^a-z0-9]+', '_', ra_id.lower()).strip('_')
+    slug = sanitize_table_name(venue_name or "")[len("events_"):]
+    if not slug:
+        return f"venue_{id_part}"
+    if conn.execute("SELECT 1 FROM venues WHERE slug = ?", (slug,)).fetchone():
+        return f"{slug}_{id_part}"
+    return slug
+
+def get_venue_id(conn: sqlite3.Connection, venue_name: str, address: str = None, slug: str = None,
+                 ra_id: str = None) -> int:
+    """
+    Return the id of a venue, adding it (and its events_<slug> view) if it is new.
+    
+    With `ra_id` (RA's venue id) the venue is looked up by that id, and its
+    name and address are kept up to date. A venue stored without an id under
+    the same slug (from an older database or file) is taken over. Without an
+    id, venues are matched by slug.
+    """
+    if ra_id is None:
+        return _get_venue_id_by_slug(conn, venue_name, address, slug)
+    
+    ra_id = str(ra_id)
+    row = conn.execute("SELECT venue_id FROM venues WHERE ra_id = ?", (ra_id,)).fetchone()
+    legacy_slug = slug or sanitize_table_name(venue_name or "")[len("events_"):]
+    if row is None and legacy_slug:
+        row = conn.execute(
+            "SELECT venue_id FROM venues WHERE slug = ? AND ra_id IS NULL", (legacy_slug,)
+        ).fetchone()
+    if row is not None:
+        conn.execute(
+            "UPDATE venues SET ra_id = ?, name = COALESCE(?, name), address = COALESCE(?, address) "
+            "WHERE venue_id = ? AND (ra_id IS NOT ? OR name IS NOT COALESCE(?, name) "
+            "OR address IS NOT COALESCE(?, address))",
+            (ra_id, venue_name or None, address, row[0], ra_id, venue_name or None, address)
         )
-        """
-        conn.execute(create_table_sql)
-        
-        # Add updated_at timestamp
-        pd_events = pd_events.copy()
-        pd_events['updated_at'] = datetime.now().isoformat()
-        
-        # Prepare data for insertion (list of dictionaries)
-        events_data = pd_events.to_dict(orient='records')
-        
-        # Insert or Replace logic
-        # We construct the INSERT OR REPLACE statement dynamically based on columns
-        columns = [
-            'event_id', 'title', 'date', 'start_time', 'end_time', 
-            'venue', 'venue_address', 'performers', 'description', 
-            'url', 'flyer_url', 'updated_at'
-        ]
-        
-        placeholders = ', '.join(['?'] * len(columns))
-        col_names = ', '.join(columns)
-        
-        sql = f"INSERT OR REPLACE INTO {table_name} ({col_names}) VALUES ({placeholders})"
-        
-        # Extract values in the correct order for each row
-        values = []
-        for row in events_data:
-            values.append([row.get(col) for col in columns])
-            
-        conn.executemany(sql, values)
-        conn.commit()
+        return row[0]
+    
+    slug = slug or _free_slug(conn, venue_name, ra_id)
+    venue_id = conn.execute(
+        "INSERT INTO venues (slug, name, address, ra_id) VALUES (?, ?, ?, ?)",
+        (slug, venue_name or slug, address, ra_id)
+    ).lastrowid
+    create_venue_view(conn, slug, venue_id)
+    return venue_id
+
+def _get_venue_id_by_slug(conn: sqlite3.Connection, venue_name: str, address: str = None,
+                          slug: str = None) -> int:
+    slug = slug or venue_slug(venue_name)
+    conn.execute(
+        "INSERT INTO venues (slug, name, address) VALUES (?, ?, ?) "
+        "ON CONFLICT (slug) DO UPDATE SET address = excluded.address "
+        "WHERE excluded.address IS NOT NULL AND venues.address IS NOT excluded.address",
+        (slug, venue_name or slug, address)
+    )
+    venue_id = conn.execute("SELECT venue_id FROM venues WHERE slug = ?", (slug,)).fetchone()[0]
+    create_venue_view(conn, slug, venue_id)
+    return venue_id
+
+def create_venue_view(conn: sqlite3.Connection, slug: str, venue_id: int):
+    """
+    Create a view with the columns of the old per-venue table, so existing
+    queries against events_<slug> keep working.
+    """
+    conn.execute(f"""
+    CREATE VIEW IF NOT EXISTS events_{slug} AS
+    SELECT e.event_id, e.title, e.date, e.start_time, e.end_time,
+           v.name AS venue, v.address AS venue_address, e.performers,
+           e.description, e.url, e.flyer_url, e.updated_at
+    FROM events e JOIN venues v ON v.venue_id = e.venue_id
+    WHERE e.venue_id = {int(venue_id)}
+    """)
+
+def migrate_venue_tables(conn: sqlite3.Connection):
+    """
+    Fold per-venue events_<slug> tables from older databases into the
+    events table, replacing each with its compatibility view.
+    """
+    tables = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'events\\_%' ESCAPE '\\'"
+    )]
+    for table_name in tables:
+        slug = table_name[len("events_"):]
+        # One transaction per table, so the rename and DDL below are atomic
+        with transaction(conn):
+            # The venue name and address were repeated on every row
+            venue = conn.execute(
+                f"SELECT venue, venue_address FROM {table_name} WHERE venue IS NOT NULL "
+                f"ORDER BY updated_at DESC LIMIT 1"
+            ).fetchone() or (slug, None)
+            conn.execute(f"ALTER TABLE {table_name} RENAME TO events_{slug}_migrating")
+            venue_id = get_venue_id(conn, venue[0], venue[1], slug=slug)
+            columns = ', '.join(STORED_COLUMNS + ['updated_at'])
+            conn.execute(
+                f"INSERT OR REPLACE INTO events (venue_id, {columns}) "
+                f"SELECT ?, {columns} FROM events_{slug}_migrating",
+                (venue_id,)
+            )
+            conn.execute(f"DROP TABLE events_{slug}_migrating")
+        print(f"Migrated table '{table_name}' into the events table")
+
+def content_hash(venue_id: int, row: list) -> str:
+    """
+    Fingerprint of everything stored for an event (row from event_rows), used
+    to skip writing events that haven't changed since the last save.
+    """
+    # RA's venue id is left out: venue_id already identifies the venue, and
+    # rows from files written before the column existed hash the same
+    row = row[:VENUE_ID_INDEX] + row[VENUE_ID_INDEX + 1:]
+    data = json.dumps([venue_id] + row, separators=(',', ':'), default=str)
+    return hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+
+def _stored_hashes(conn: sqlite3.Connection, event_ids: list) -> dict:
+    hashes = {}
+    # Stay under SQLite's default limit of 999 bound parameters
+    for start in range(0, len(event_ids), 900):
+        chunk = event_ids[start:start + 900]
+        placeholders = ', '.join(['?'] * len(chunk))
+        hashes.update(conn.execute(
+            f"SELECT event_id, content_hash FROM events WHERE event_id IN ({placeholders})", chunk
+        ))
+    return hashes
+
+def insert_event_rows(conn: sqlite3.Connection, venue_id: int, rows: list, updated_at: str) -> dict:
+    """
+    Upsert rows (from event_rows) into the events table for one venue.
+    Rows whose content hash matches the stored one are not written at all,
+    so they keep their updated_at.
+    
+    Returns:
+        Dict with 'inserted', 'updated' and 'unchanged' counts
+    """
+    indexes = [EVENT_COLUMNS.index(col) for col in STORED_COLUMNS]
+    stored = _stored_hashes(conn, [row[0] for row in rows])
+    
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    changed = {}
+    for row in rows:
+        row_hash = content_hash(venue_id, row)
+        if row[0] not in stored:
+            counts['inserted'] += 1
+        elif stored[row[0]] != row_hash:
+            counts['updated'] += 1
+        else:
+            counts['unchanged'] += 1
+            continue
+        # A later duplicate of the same event wins, as it did with INSERT OR REPLACE
+        changed[row[0]] = (row, row_hash)
+    if not changed:
+        return counts
+    
+    columns = ['venue_id'] + STORED_COLUMNS + ['updated_at', 'content_hash']
+    placeholders = ', '.join(['?'] * len(columns))
+    col_names = ', '.join(columns)
+    assignments = ', '.join(f"{col} = excluded.{col}" for col in columns)
+    
+    # The WHERE clause also keeps concurrent savers from rewriting equal rows
+    sql = (
+        f"INSERT INTO events ({col_names}) VALUES ({placeholders}) "
+        f"ON CONFLICT (event_id) DO UPDATE SET {assignments} "
+        f"WHERE events.content_hash IS NOT excluded.content_hash"
+    )
+    conn.executemany(sql, [
+        [venue_id] + [row[i] for i in indexes] + [updated_at, row_hash]
+        for row, row_hash in changed.values()
+    ])
+    insert_event_artists(conn, [row for row, _ in changed.values()])
+    return counts
+
+def format_counts(counts: dict) -> str:
+    return f"{counts['inserted']} new, {counts['updated']} updated, {counts['unchanged']} unchanged"
+
+def add_counts(totals: dict, venue: tuple, counts: dict):
+    """
+    Add one save's counts to the running totals of a venue (see venue_key).
+    """
+    venue_totals = totals.setdefault(venue, {'inserted': 0, 'updated': 0, 'unchanged': 0})
+    for field, value in counts.items():
+        venue_totals[field] += value
+
+def format_venue(venue: tuple) -> str:
+    """
+    Venue name for messages, with the RA id when known, e.g. 'Warehouse' (RA id 200).
+    """
+    ra_id, venue_name = venue
+    return f"'{venue_name}' (RA id {ra_id})" if ra_id else f"'{venue_name}'"
+
+def _parse_artists(value) -> list:
+    """
+    Artists of a row as a list of {"id", "name"} dicts, or None if unknown
+    (e.g. a CSV written before artists were exported).
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return [a for a in value if isinstance(a, dict) and a.get("id") and a.get("name")]
+
+def insert_event_artists(conn: sqlite3.Connection, rows: list):
+    """
+    Replace the artist links of the events in `rows` (from event_rows).
+    Rows whose artists are unknown keep their existing links.
+    """
+    event_index = EVENT_COLUMNS.index('event_id')
+    artists_index = EVENT_COLUMNS.index('artists')
+    artists = {}
+    links = []
+    linked_events = []
+    for row in rows:
+        event_artists = _parse_artists(row[artists_index])
+        if event_artists is None:
+            continue
+        event_id = str(row[event_index])
+        linked_events.append((event_id,))
+        for position, artist in enumerate(event_artists):
+            artist_id = str(artist["id"])
+            artists[artist_id] = artist["name"]
+            links.append((event_id, artist_id, position))
+    
+    conn.executemany("DELETE FROM event_artists WHERE event_id = ?", linked_events)
+    conn.executemany(
+        "INSERT INTO artists (artist_id, name) VALUES (?, ?) "
+        "ON CONFLICT (artist_id) DO UPDATE SET name = excluded.name WHERE name != excluded.name",
+        list(artists.items())
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO event_artists (event_id, artist_id, position) VALUES (?, ?, ?)", links
+    )
+
+def _venue_address(rows: list):
+    address_index = EVENT_COLUMNS.index('venue_address')
+    return next((row[address_index] for row in rows if row[address_index]), None)
+
+def _venue_ra_id(rows: list):
+    return next((row[VENUE_ID_INDEX] for row in rows if row[VENUE_ID_INDEX]), None)
+
+def venue_key(event) -> tuple:
+    """
+    (RA venue id, venue name) of an Event or row dict, for grouping events
+    by venue before saving: names alone can be shared by different venues.
+    """
+    if isinstance(event, dict):
+        venue_id = event.get("venue_id")
+        venue_id = None if venue_id is None or venue_id == "" or venue_id != venue_id else str(venue_id)
+        return venue_id, event.get("venue") or None
+    return event.venue_id, event.venue or None
+
+def save_events(events, db_path: str, venue_name: str, verbose: bool = True):
+    """
+    Save one venue's events to a SQLite database.
+    Adds the venue if it isn't known yet. Events that haven't changed are skipped.
+    The venue is identified by the events' venue_id (RA's id) when they
+    have one, so all events passed in must belong to the same venue.
+    
+    Args:
+        events: DataFrame, list of Event records or list of dicts (see event_rows)
+        verbose: Print a summary line
+    
+    Returns:
+        Dict with 'inserted', 'updated' and 'unchanged' counts
+    """
+    rows = event_rows(events)
+    if not rows:
+        print("No events to save to database.")
+        return {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    
+    conn = get_connection(db_path)
+    try:
+        with transaction(conn):
+            venue_id = get_venue_id(conn, venue_name, _venue_address(rows), ra_id=_venue_ra_id(rows))
+            counts = insert_event_rows(conn, venue_id, rows, datetime.now().isoformat())
         
-        print(f"Saved {len(pd_events)} events to table '{table_name}' in {db_path}")
+        if verbose:
+            print(f"Saved {len(rows)} events for venue '{venue_name}' in {db_path} ({format_counts(counts)})")
+        return counts
         
     except Exception as e:
         print(f"Error saving events to database: {e}")
         # Re-raise to let the caller know
         raise
-    finally:
-        conn.close()
+
+def stream_events(events, db_path: str, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+    """
+    Write an iterable of Event records to the database as they arrive,
+    one transaction per `batch_size` events. Events of many venues can be mixed.
+    
+    Returns:
+        Dict mapping (RA venue id, venue name) -> dict of 'inserted', 'updated'
+        and 'unchanged' counts
+    """
+    counts = {}
+    venue_ids = {}
+    updated_at = datetime.now().isoformat()
+    
+    def flush(batch):
+        by_venue = {}
+        for event in batch:
+            by_venue.setdefault(venue_key(event), []).append(event)
+        with transaction(conn):
+            for key, venue_events in by_venue.items():
+                ra_id, venue_name = key
+                venue_name = venue_name or "unknown_venue"
+                rows = event_rows(venue_events)
+                if key not in venue_ids:
+                    venue_ids[key] = get_venue_id(conn, venue_name, _venue_address(rows), ra_id=ra_id)
+                venue_counts = insert_event_rows(conn, venue_ids[key], rows, updated_at)
+                add_counts(counts, (ra_id, venue_name), venue_counts)
+    
+    conn = get_connection(db_path)
+    try:
+        pending = []
+        for event in events:
+            pending.append(event)
+            if len(pending) >= batch_size:
+                flush(pending)
+                pending = []
+        if pending:
+            flush(pending)
+    except Exception as e:
+        print(f"Error saving events to database: {e}")
+        raise
+    
+    return counts
+
+def get_high_water_marks(db_path: str) -> dict:
+    """
+    Return the date of the latest stored past event for each venue.
+    Used by incremental scraping to skip history that is already in the database.
+    
+    Returns:
+        Dict mapping RA venue id (the club ID) -> latest event date (ISO
+        string) that is not in the future. Venues stored without an RA id
+        (from old files) are keyed by name instead.
+    """
+    marks = {}
+    if not os.path.exists(db_path):
+        return marks
+    
+    today = datetime.now().strftime("%Y-%m-%dT23:59:59")
+    rows = get_connection(db_path).execute(
+        "SELECT COALESCE(v.ra_id, v.name), MAX(e.date) FROM events e JOIN venues v ON v.venue_id = e.venue_id "
+        "WHERE e.date <= ? GROUP BY e.venue_id", (today,)
+    )
+    for venue, latest in rows:
+        if venue and latest:
+            marks[venue] = latest
+    
+    return marks
+
+def find_events_by_artist(db_path: str, artist: str, upcoming_only: bool = True) -> list:
+    """
+    Find the events an artist plays, using the artist indexes.
+    
+    Args:
+        artist: RA artist ID or exact artist name (case-insensitive)
+        upcoming_only: Only return events from today on
+    
+    Returns:
+        List of event dicts (EVENT_COLUMNS minus artists), soonest first
+    """
+    since = datetime.now().strftime("%Y-%m-%d") if upcoming_only else ""
+    cursor = get_connection(db_path).execute(
+        """
+        SELECT e.event_id, e.title, e.date, e.start_time, e.end_time,
+               v.name, v.address, e.performers, e.description, e.url, e.flyer_url
+        FROM artists a
+        JOIN event_artists ea ON ea.artist_id = a.artist_id
+        JOIN events e ON e.event_id = ea.event_id
+        JOIN venues v ON v.venue_id = e.venue_id
+        WHERE (a.artist_id = ? OR a.name = ? COLLATE NOCASE) AND e.date >= ?
+        ORDER BY e.date
+        """,
+        (artist, artist, since)
+    )
+    return [dict(zip(EVENT_COLUMNS, row)) for row in cursor]
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query matching every word as a prefix,
+    e.g. "ben uf" -> '"ben"* "uf"*'.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", text))
+
+def search_events(db_path: str, query: str, limit: int = 20, upcoming_only: bool = False,
+                  venue: str = None, raw: bool = False) -> list:
+    """
+    Full-text search over event titles, performers and descriptions.
+    
+    Args:
+        query: Words to look for (all must match, as prefixes), or an FTS5
+            query expression when raw=True
+        limit: Maximum number of results
+        upcoming_only: Only return events from today on
+        venue: Only return events of this venue (name or RA venue id)
+    
+    Returns:
+        List of dicts (event_id, date, title, venue, performers, url, snippet, score),
+        best match first. `snippet` marks matches with [brackets].
+    """
+    match = query if raw else fts_query(query)
+    if not match:
+        return []
+    
+    sql = f"""
+        SELECT e.event_id, e.date, e.title, v.name, e.performers, e.url,
+               snippet(fts_events, -1, '[', ']', '...', 12),
+               bm25(fts_events, {', '.join(str(w) for w in FTS_WEIGHTS)}) AS score
+        FROM fts_events
+        JOIN events e ON e.rowid = fts_events.rowid
+        JOIN venues v ON v.venue_id = e.venue_id
+        WHERE fts_events MATCH ?
+    """
+    params = [match]
+    if upcoming_only:
+        sql += " AND e.date >= ?"
+        params.append(datetime.now().strftime("%Y-%m-%d"))
+    if venue:
+        sql += " AND (v.ra_id = ? OR v.name = ? COLLATE NOCASE OR v.slug = ?)"
+        params += [venue, venue, venue_slug(venue)]
+    sql += " ORDER BY score LIMIT ?"
+    params.append(limit)
+    
+    columns = ['event_id', 'date', 'title', 'venue', 'performers', 'url', 'snippet', 'score']
+    return [dict(zip(columns, row)) for row in get_connection(db_path).execute(sql, params)]
@@ -1,15 +1,6 @@
-import requests
 import json
 
-GRAPHQL_URL = "https://ra.co/graphql"
-HEADERS = {
-    "Content-Type": "application/json",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Accept": "application/json",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Origin": "https://ra.co",
-    "Referer": "https://ra.co/",
-}
+import ra_client
 
 # Introspection query for Event fields
 query = """
@@ -27,7 +18,7 @@ payload = {
 }
 
 print("Introspecting Event fields...")
-response = requests.post(GRAPHQL_URL, headers=HEADERS, json=payload)
+response = ra_client.post(payload)
 print(f"Status Code: {response.status_code}")
 
 try:
@@ -38,3 +29,38 @@ try:
 except Exception as e:
     print(f"Failed to parse JSON: {e}")
     print(response.text[:1000])
+
+# Arguments of Venue.events; the scraper pages with `limit` and `page`
+query = """
+query {
+  __type(name: "Venue") {
+    fields {
+      name
+      args {
+        name
+        type { name kind ofType { name } }
+      }
+    }
+  }
+}
+"""
+
+print("Introspecting Venue.events arguments...")
+response = ra_client.post({"query": query})
+print(f"Status Code: {response.status_code}")
+
+try:
+    data = response.json()
+    fields = data.get("data", {}).get("__type", {}).get("fields", [])
+    events_field = next((f for f in fields if f["name"] == "events"), None)
+    if events_field is None:
+        print("Venue has no 'events' field")
+    else:
+        arg_names = [a["name"] for a in events_field["args"]]
+        print("Venue.events arguments:", arg_names)
+        for required in ("type", "limit", "page"):
+            if required not in arg_names:
+                print(f"Warning: the scraper passes '{required}', which Venue.events doesn't accept")
+except Exception as e:
+    print(f"Failed to parse JSON: {e}")
+    print(response.text[:1000])
@@ -0,0 +1,178 @@
+"""
+Incremental decoding of RA GraphQL venue responses.
+
+Walks `data.<venue>.<event list>[]` while the response body is still
+arriving, so only one event object is decoded and held at a time instead of
+the raw body plus the full decoded tree. The walker only descends into the
+structural levels of the response and hands each event object to
+json.JSONDecoder.raw_decode, so the per-event work stays in the C decoder.
+
+It yields (venue_key, venue_header, list_key, event) tuples where
+`venue_key` is 'venue' or a batch alias, `venue_header` holds the scalar
+fields of the venue seen so far (id, name, address) and `event` is the
+decoded event object.
+"""
+
+import codecs
+import json
+
+from ra_client import GraphQLError
+
+
+WHITESPACE = " \t\n\r"
+DELIMITERS = WHITESPACE + ",:]}"
+
+# Drop consumed text from the buffer once this many characters have been read
+COMPACT_AT = 64 * 1024
+
+
+class _Reader:
+    """
+    Pull-style reader over an iterator of byte chunks.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._exhausted = False
+        self.buf = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        if self._exhausted:
+            return False
+        if self.pos > COMPACT_AT:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        for chunk in self._chunks:
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buf += text
+                return True
+        self.buf += self._utf8.decode(b"", final=True)
+        self._exhausted = True
+        return False
+
+    def peek(self) -> str:
+        """
+        Return the next non-whitespace character without consuming it ('' at end).
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at offset {self.pos}, found {found!r}")
+        self.pos += 1
+
+    def read_value(self):
+        """
+        Decode the next complete JSON value, reading more chunks as needed.
+        """
+        scalar = self.peek() not in '{["'
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off at a chunk boundary ("12" of "12.5") decodes fine,
+            # so only trust a scalar once a delimiter follows it
+            if scalar and not self._exhausted and (end == len(self.buf) or self.buf[end] not in DELIMITERS):
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def iter_object(self):
+        """
+        Consume an object, yielding each key. The caller must consume the
+        key's value (read_value or a nested iter_*) before the next iteration.
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self.expect(":")
+            yield key
+            separator = self.peek()
+            self.pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '}}' at offset {self.pos - 1}, found {separator!r}")
+
+    def iter_array(self):
+        """
+        Consume an array, yielding each decoded element.
+        """
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.read_value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' at offset {self.pos - 1}, found {separator!r}")
+
+    def finish(self):
+        """
+        Read the rest of the body, which may only be whitespace. This also
+        runs the chunk source to completion, so code after its last chunk
+        (caching, archiving) gets to run.
+        """
+        found = self.peek()
+        if found:
+            raise ValueError(f"Unexpected data at offset {self.pos}: {found!r}")
+
+
+def iter_venue_events(chunks):
+    """
+    Yield (venue_key, venue_header, list_key, event) for every element of
+    every event list in a (possibly batched) venue response body.
+
+    Raises ra_client.GraphQLError once the body is read if it carried
+    top-level errors and no data.
+
+    Args:
+        chunks: Iterable of bytes chunks making up the response body
+    """
+    reader = _Reader(chunks)
+    errors = None
+    has_data = False
+    for key in reader.iter_object():
+        if key == "errors":
+            errors = reader.read_value()
+            continue
+        if key != "data" or reader.peek() != "{":
+            reader.read_value()
+            continue
+        has_data = True
+        for venue_key in reader.iter_object():
+            if reader.peek() != "{":
+                reader.read_value()  # null venue
+                continue
+            header = {}
+            for field in reader.iter_object():
+                if reader.peek() == "[":
+                    for event in reader.iter_array():
+                        yield venue_key, header, field, event
+                else:
+                    header[field] = reader.read_value()
+    reader.finish()
+    if errors and not has_data:
+        raise GraphQLError(errors)
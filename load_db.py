@@ -1,49 +1,257 @@
 import argparse
-import pandas as pd
+import columnar
+import csv
 import database
+import glob
+import io
+import json
 import sys
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+# Rows read, saved and committed at a time
+DEFAULT_CHUNK_SIZE = 10000
+
+# Scraper outputs picked up from directories and glob patterns
+INPUT_EXTENSIONS = (".csv", ".json", ".jsonl") + columnar.EXTENSIONS
+
+def iter_chunks(rows, chunk_size: int):
+    """
+    Yield lists of up to chunk_size items from an iterator.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def load_csv(csv_file: str, db_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+             default_venue: str = "unknown_venue") -> dict:
+    """
+    Stream a CSV file into the database chunk by chunk, so memory use stays
+    bounded however large the file is. Each chunk is grouped by venue (its
+    `venue_id` and `venue` columns) and all groups are written in one
+    transaction, so a combined multi-venue export is filed under the right
+    venues in a single pass.
+    
+    Args:
+        default_venue: Venue for rows with no venue (or files without the column)
+    
+    Returns:
+        Dict mapping (RA venue id, venue name) -> dict of 'inserted', 'updated'
+        and 'unchanged' counts
+    """
+    totals = {}
+    file_size = os.path.getsize(csv_file)
+    start = time.perf_counter()
+    loaded = 0
+    
+    with open(csv_file, "rb") as raw:
+        reader = csv.DictReader(io.TextIOWrapper(raw, encoding="utf-8", newline=""))
+        for chunk in iter_chunks(reader, chunk_size):
+            if loaded == 0:
+                if "venue" not in reader.fieldnames:
+                    print(f"Warning: 'venue' column missing in CSV. Using '{default_venue}'.")
+                print(f"Saving to database {db_path}...")
+            
+            by_venue = {}
+            for row in chunk:
+                ra_id, venue_name = database.venue_key(row)
+                by_venue.setdefault((ra_id, venue_name or default_venue), []).append(row)
+            
+            with database.batch(db_path):
+                for venue, rows in by_venue.items():
+                    counts = database.save_events(rows, db_path, venue[1], verbose=False)
+                    database.add_counts(totals, venue, counts)
+            loaded += len(chunk)
+            
+            elapsed = time.perf_counter() - start
+            # The byte offset runs ahead of the parsed rows by at most one read buffer
+            done = raw.tell() / file_size if file_size else 1
+            print(f"  {loaded:,} rows ({done:.0%}), {len(totals)} venues, {loaded / elapsed:,.0f} rows/sec")
+    
+    return totals
+
+def expand_inputs(paths: list) -> list:
+    """
+    Expand directories (searched recursively for INPUT_EXTENSIONS files) and
+    glob patterns (for shells that don't) into a list of files, in order and
+    without duplicates.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files += [os.path.join(root, name) for name in sorted(names) if name.endswith(INPUT_EXTENSIONS)]
+        elif any(char in path for char in "*?["):
+            files += sorted(glob.glob(path, recursive=True))
+        else:
+            files.append(path)
+    return list(dict.fromkeys(files))
+
+def read_rows(path: str):
+    """
+    Yield the event records of a scraper output file (.csv, .json, .jsonl,
+    .parquet or .feather) as dicts.
+    """
+    if path.endswith(columnar.EXTENSIONS):
+        yield from columnar.iter_rows(path)
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".jsonl"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif path.endswith(".json"):
+            yield from json.load(f)
+        else:
+            yield from csv.DictReader(f)
+
+def parse_file(path: str, default_venue: str = "unknown_venue") -> tuple:
+    """
+    Read a file and group its rows by venue. Runs in the worker processes of
+    load_files, so parsing is spread across CPUs while one process writes.
+    
+    Returns:
+        (dict mapping (RA venue id, venue name) -> list of row dicts, number of rows)
+    """
+    by_venue = {}
+    count = 0
+    for row in read_rows(path):
+        # JSON outputs hold artists as a list; store them the way CSV does,
+        # so the same event hashes the same whichever format it came from
+        if isinstance(row.get("artists"), list):
+            row["artists"] = json.dumps(row["artists"])
+        ra_id, venue_name = database.venue_key(row)
+        by_venue.setdefault((ra_id, venue_name or default_venue), []).append(row)
+        count += 1
+    return by_venue, count
+
+def load_files(files: list, db_path: str, workers: int = None,
+               default_venue: str = "unknown_venue") -> dict:
+    """
+    Load many scraper output files in one run. Files are parsed in a process
+    pool; this process is the single writer and saves each parsed file in
+    one transaction as soon as it arrives.
+    
+    Returns:
+        Dict mapping (RA venue id, venue name) -> dict of 'inserted', 'updated'
+        and 'unchanged' counts
+    """
+    totals = {}
+    start = time.perf_counter()
+    loaded_rows = 0
+    loaded_files = 0
+    failed = []
+    
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        remaining = iter(files)
+        pending = {}
+        # Only keep a couple of parsed files per worker waiting to be written
+        max_pending = 2 * workers
+        
+        def submit_next():
+            path = next(remaining, None)
+            if path is not None:
+                pending[executor.submit(parse_file, path, default_venue)] = path
+        
+        for _ in range(max_pending):
+            submit_next()
+        
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                submit_next()
+                try:
+                    by_venue, count = future.result()
+                except Exception as e:
+                    print(f"  Error reading {path}: {e}")
+                    failed.append(path)
+                    continue
+                
+                with database.batch(db_path):
+                    for venue, rows in by_venue.items():
+                        counts = database.save_events(rows, db_path, venue[1], verbose=False)
+                        database.add_counts(totals, venue, counts)
+                loaded_rows += count
+                loaded_files += 1
+                
+                elapsed = time.perf_counter() - start
+                print(f"  [{loaded_files + len(failed)}/{len(files)}] {path}: {count:,} rows, "
+                      f"{len(by_venue)} venues ({loaded_rows / elapsed:,.0f} rows/sec overall)")
+    
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {loaded_rows:,} rows from {loaded_files} files in {elapsed:.1f}s "
+          f"({loaded_rows / elapsed if elapsed else 0:,.0f} rows/sec, "
+          f"{loaded_files / elapsed if elapsed else 0:.1f} files/sec)")
+    if failed:
+        print(f"{len(failed)} files could not be read: {', '.join(failed)}")
+    return totals
 
 def main():
     parser = argparse.ArgumentParser(
-        description="Load event CSV data into SQLite database"
+        description="Load event CSV/JSON data into SQLite database"
     )
     parser.add_argument(
-        "csv_file",
-        help="Path to the CSV file containing event data"
+        "inputs",
+        nargs="+",
+        help="CSV, JSON, JSONL, Parquet or Feather files, directories or glob patterns (e.g. 'archive/*.csv')"
     )
     parser.add_argument(
         "--db",
         default="events.db",
         help="SQLite database path (default: events.db)"
     )
+    parser.add_argument(
+        "--venue",
+        default="unknown_venue",
+        help="Venue for rows without one, e.g. CSVs that have no venue column (default: unknown_venue)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Rows saved and committed at a time, for a single CSV file (default: {DEFAULT_CHUNK_SIZE})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processes parsing files when loading several (default: number of CPUs)"
+    )
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.csv_file):
-        print(f"Error: CSV file '{args.csv_file}' not found.")
+    files = expand_inputs(args.inputs)
+    missing = [path for path in files if not os.path.isfile(path)]
+    if missing:
+        print(f"Error: file '{missing[0]}' not found.")
+        sys.exit(1)
+    if not files:
+        print("Error: no CSV/JSON/Parquet files found.")
         sys.exit(1)
         
     try:
-        print(f"Reading events from {args.csv_file}...")
-        df = pd.read_csv(args.csv_file)
-        
-        if df.empty:
-            print("CSV file is empty. Nothing to load.")
-            return
-
-        # Infer venue name from the first row
-        if "venue" in df.columns:
-            venue_name = df.iloc[0]["venue"]
-            print(f"Detected venue: {venue_name}")
+        start = time.perf_counter()
+        if len(files) == 1 and files[0].endswith(".csv"):
+            # A single (possibly huge) CSV is streamed in chunks instead
+            print(f"Reading events from {files[0]}...")
+            totals = load_csv(files[0], args.db, args.chunk_size, args.venue)
         else:
-            # Fallback if venue column is missing (should stick to file name or user input ideally)
-            print("Warning: 'venue' column missing in CSV. Using 'unknown_venue'.")
-            venue_name = "unknown_venue"
-            
-        print(f"Saving to database {args.db}...")
-        database.save_events(df, args.db, venue_name)
-        print("Done.")
+            print(f"Loading {len(files)} files into {args.db}...")
+            totals = load_files(files, args.db, args.workers, args.venue)
+        if not totals:
+            print("No events found. Nothing to load.")
+            return
+        for venue, counts in sorted(totals.items(), key=lambda item: (item[0][1], item[0][0] or "")):
+            print(f"  {database.format_venue(venue)}: {database.format_counts(counts)}")
+        print(f"Done in {time.perf_counter() - start:.1f}s, {len(totals)} venues.")
         
     except Exception as e:
         print(f"Error loading data: {e}")
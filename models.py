@@ -0,0 +1,89 @@
+"""
+Record types for scraped data.
+
+Event is a slotted record instead of a dict: no per-instance __dict__, and
+strings repeated across many events (venue id, name and address, dates,
+artist ids and names) are interned so every event shares one copy. The
+"https://ra.co" prefix of event URLs is not stored at all; only the path is
+kept and the full URL is built when the record is written out.
+"""
+
+import json
+import sys
+
+RA_BASE_URL = "https://ra.co"
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class Event:
+    """
+    One event, flattened for CSV/JSON/SQLite output.
+    """
+
+    # Column order used for rows, CSV headers and DataFrames. venue_id (RA's
+    # id for the venue) is last so earlier columns keep their positions.
+    FIELDS = (
+        "event_id", "title", "date", "start_time", "end_time", "venue",
+        "venue_address", "performers", "description", "url", "flyer_url", "artists",
+        "venue_id",
+    )
+
+    __slots__ = (
+        "event_id", "title", "date", "start_time", "end_time", "venue",
+        "venue_address", "performers", "description", "content_url", "flyer_url", "artists",
+        "venue_id",
+    )
+
+    def __init__(self, event_id=None, title=None, date=None, start_time=None, end_time=None,
+                 venue="", venue_address="", performers="", description="", content_url="",
+                 flyer_url="", artists=(), venue_id=None):
+        self.event_id = event_id
+        self.title = title
+        self.date = _intern(date)
+        self.start_time = start_time
+        self.end_time = end_time
+        self.venue = _intern(venue)
+        self.venue_address = _intern(venue_address)
+        self.performers = performers
+        self.description = description
+        self.content_url = content_url
+        self.flyer_url = flyer_url
+        # (artist_id, name) pairs in billing order
+        self.artists = tuple((_intern(artist_id), _intern(name)) for artist_id, name in artists)
+        self.venue_id = _intern(str(venue_id)) if venue_id is not None else None
+
+    @property
+    def url(self) -> str:
+        return f"{RA_BASE_URL}{self.content_url}" if self.content_url else ""
+
+    def artist_records(self) -> list:
+        return [{"id": artist_id, "name": name} for artist_id, name in self.artists]
+
+    def as_row(self) -> tuple:
+        """
+        Return the event as a tuple in FIELDS order, for csv.writer and SQLite.
+        Artists are encoded as a JSON list of {"id", "name"} objects.
+        """
+        return (
+            self.event_id, self.title, self.date, self.start_time, self.end_time, self.venue,
+            self.venue_address, self.performers, self.description, self.url, self.flyer_url,
+            json.dumps(self.artist_records()), self.venue_id,
+        )
+
+    def as_dict(self) -> dict:
+        record = dict(zip(self.FIELDS, self.as_row()))
+        record["artists"] = self.artist_records()
+        return record
+
+    def __eq__(self, other):
+        if not isinstance(other, Event):
+            return NotImplemented
+        return self.as_row() == other.as_row()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Event(event_id={self.event_id!r}, date={self.date!r}, title={self.title!r})"
@@ -0,0 +1,823 @@
+"""
+Shared HTTP client for RA.co's GraphQL API.
+
+All GraphQL calls go through one pooled requests.Session so TCP connections
+and TLS sessions are kept alive and reused across requests and worker threads.
+"""
+
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout, as_completed
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+try:
+    import orjson
+except ImportError:  # optional fast JSON backend
+    orjson = None
+
+
+# RA.co GraphQL endpoint
+GRAPHQL_URL = "https://ra.co/graphql"
+
+# Headers to mimic a browser request
+HEADERS = {
+    "Content-Type": "application/json",
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Origin": "https://ra.co",
+    "Referer": "https://ra.co/",
+}
+
+# Number of distinct hosts to keep connection pools for
+DEFAULT_POOL_CONNECTIONS = 10
+# Maximum number of in-flight requests per host, shared by all worker threads.
+# It also sizes each host's keep-alive pool: a request only holds a connection
+# while it holds a per-host slot, so more idle connections would never be used.
+DEFAULT_PER_HOST_LIMIT = 4
+
+# Starting request rate (requests/second) shared by all workers, and the
+# ceiling the adaptive limiter may raise it to while requests succeed
+DEFAULT_RATE = 4.0
+DEFAULT_MAX_RATE = 20.0
+# Retries after a throttled (429), server error (5xx) or connection failure
+DEFAULT_MAX_RETRIES = 5
+# Base and cap (seconds) for exponential backoff between retries
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 60.0
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Chunk size for streamed response bodies, and the largest streamed body
+# that is still kept in memory to be written to the response cache
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Seconds to wait for a connection to open and for the server to send data
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+# Consecutive failures (connection errors, timeouts, 5xx) that open the circuit,
+# and seconds it stays open before a single trial request is let through
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_COOLDOWN = 30.0
+# Hedged requests fire a second attempt once the first has been running
+# longer than this percentile of recent request latencies
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 50
+
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised instead of sending a request while the circuit breaker is open.
+    """
+
+
+class TransferError(requests.RequestException):
+    """
+    Raised by post_graphql_stream when the body of a response breaks off
+    while it is being read (see retry_transfer).
+    """
+
+
+class GraphQLError(Exception):
+    """
+    Raised when RA answers a query with top-level errors and no data, e.g.
+    because the query uses a field or argument its schema doesn't have.
+    GraphQL reports these with HTTP 200, so they are not retried.
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        messages = [e.get("message", str(e)) if isinstance(e, dict) else str(e) for e in errors or []]
+        super().__init__("GraphQL errors: " + "; ".join(messages))
+
+
+def check_errors(response_data: dict):
+    """
+    Raise GraphQLError if a decoded response carries errors but no data.
+    """
+    if response_data.get("errors") and not response_data.get("data"):
+        raise GraphQLError(response_data["errors"])
+
+
+class ConnectionStats:
+    """
+    Thread-safe counters for requests sent and TCP connections opened.
+    Every request that did not open a connection reused a pooled one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections_opened = 0
+        self.retries = 0
+        self.throttled = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_retry(self, throttled: bool):
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+
+    def record_hedge(self, won: bool = False):
+        with self._lock:
+            if won:
+                self.hedge_wins += 1
+            else:
+                self.hedged += 1
+
+    @property
+    def connections_reused(self) -> int:
+        return max(0, self.requests - self.connections_opened)
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.connections_opened = 0
+            self.retries = 0
+            self.throttled = 0
+            self.hedged = 0
+            self.hedge_wins = 0
+
+    def summary(self) -> str:
+        return (f"{self.requests} requests, {self.connections_opened} connections opened, "
+                f"{self.connections_reused} reused, {self.retries} retries ({self.throttled} throttled), "
+                f"{self.hedged} hedged ({self.hedge_wins} won)")
+
+
+stats = ConnectionStats()
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by all worker threads.
+
+    The rate adapts AIMD-style: every throttled response halves it (down to
+    `min_rate`), every successful request raises it a little (up to
+    `max_rate`). pause() holds back all callers, e.g. for a Retry-After header.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, max_rate: float = DEFAULT_MAX_RATE,
+                 min_rate: float = 0.2, burst: float = None):
+        self.rate = rate
+        self.max_rate = max(rate, max_rate)
+        self.min_rate = min(rate, min_rate)
+        self.burst = burst or max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Block until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def on_success(self):
+        with self._lock:
+            # Additive increase: about +1 req/s after `rate` successful requests
+            self.rate = min(self.max_rate, self.rate + 1.0 / self.rate)
+
+    def on_throttled(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._tokens = min(self._tokens, 0.0)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Fails fast while the endpoint looks degraded.
+
+    After `threshold` consecutive failures the circuit opens and requests
+    raise CircuitOpenError for `cooldown` seconds. Then one trial request is
+    let through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_BREAKER_THRESHOLD,
+                 cooldown: float = DEFAULT_BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return "open"
+            return "half-open"
+
+    def before_request(self):
+        """
+        Raise CircuitOpenError unless a request may be sent now.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self.cooldown - (time.monotonic() - self._opened_at)
+            if remaining > 0:
+                raise CircuitOpenError(f"circuit open, retrying in {remaining:.1f}s")
+            if self._trial_in_flight:
+                raise CircuitOpenError("circuit half-open, trial request in flight")
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent request latencies to estimate percentiles.
+    """
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float):
+        """
+        Return the q-quantile (0..1) of recent latencies, or None with too few samples.
+        """
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+latencies = LatencyTracker()
+
+
+def retry_after_seconds(response: requests.Response):
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into seconds, or None.
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for the given retry attempt (0-based).
+    """
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        stats.record_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        stats.record_connection()
+        return super()._new_conn()
+
+
+class _CountingAdapter(HTTPAdapter):
+    """
+    HTTPAdapter whose connection pools report each new connection to `stats`.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+_pool_connections = DEFAULT_POOL_CONNECTIONS
+_per_host_limit = DEFAULT_PER_HOST_LIMIT
+_max_retries = DEFAULT_MAX_RETRIES
+_limiter = TokenBucket()
+_timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+_breaker = CircuitBreaker()
+_hedge = False
+_hedge_executor = None
+_workers = None
+
+_session = None
+_session_lock = threading.Lock()
+_host_semaphores = {}
+_cache = None
+_archive = None
+
+
+def configure(pool_connections: int = None, per_host: int = None,
+              rate: float = None, max_rate: float = None, max_retries: int = None,
+              connect_timeout: float = None, read_timeout: float = None,
+              breaker_threshold: int = None, breaker_cooldown: float = None, hedge: bool = None,
+              workers: int = None):
+    """
+    Change pool sizes, the per-host concurrency cap, the rate limiter and
+    the failure handling of requests. The shared session is rebuilt on next use.
+
+    Args:
+        pool_connections: Number of hosts to keep connection pools for
+        per_host: Maximum concurrent requests per host, and keep-alive connections kept per host
+        rate: Starting request rate in requests/second (0 disables rate limiting)
+        max_rate: Ceiling for the adaptive request rate
+        max_retries: Retries for throttled, 5xx and connection-failed requests
+        connect_timeout: Seconds to wait for a connection
+        read_timeout: Seconds to wait for the server to send data
+        breaker_threshold: Consecutive failures that open the circuit (0 disables the breaker)
+        breaker_cooldown: Seconds the circuit stays open before a trial request
+        hedge: Send a second attempt when a request runs past the p95 latency
+        workers: Number of threads sending requests at once (sizes the hedging thread pool)
+    """
+    global _pool_connections, _per_host_limit, _max_retries, _limiter
+    global _timeout, _breaker, _hedge, _workers, _hedge_executor
+    if per_host is not None and per_host < 1:
+        raise ValueError("per-host limit must be at least 1")
+    if rate is not None or max_rate is not None:
+        if rate is None:
+            rate = _limiter.rate if _limiter else DEFAULT_RATE
+        if max_rate is None:
+            max_rate = DEFAULT_MAX_RATE
+        _limiter = TokenBucket(rate, max_rate) if rate > 0 else None
+    if max_retries is not None:
+        _max_retries = max_retries
+    if connect_timeout is not None or read_timeout is not None:
+        _timeout = (connect_timeout or _timeout[0], read_timeout or _timeout[1])
+    if breaker_threshold is not None or breaker_cooldown is not None:
+        if breaker_threshold is None:
+            breaker_threshold = _breaker.threshold if _breaker else DEFAULT_BREAKER_THRESHOLD
+        if breaker_cooldown is None:
+            breaker_cooldown = _breaker.cooldown if _breaker else DEFAULT_BREAKER_COOLDOWN
+        _breaker = CircuitBreaker(breaker_threshold, breaker_cooldown) if breaker_threshold > 0 else None
+    if hedge is not None:
+        _hedge = hedge
+    with _session_lock:
+        if pool_connections is not None:
+            _pool_connections = pool_connections
+        if per_host is not None:
+            _per_host_limit = per_host
+        if workers is not None:
+            _workers = workers
+        _host_semaphores.clear()
+        _close_session()
+        # Resized on next use
+        if _hedge_executor is not None:
+            _hedge_executor.shutdown(wait=False)
+            _hedge_executor = None
+
+
+def _close_session():
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
+
+
+def close():
+    """
+    Close the shared session and all pooled connections.
+    """
+    with _session_lock:
+        _close_session()
+
+
+def set_cache(cache):
+    """
+    Serve post_graphql from `cache` (a response_cache.ResponseCache) when
+    possible and store fresh responses in it. Pass None to disable caching.
+    """
+    global _cache
+    _cache = cache
+
+
+def get_cache():
+    return _cache
+
+
+def set_archive(archive):
+    """
+    Record every response body post_graphql and post_graphql_stream return,
+    including cache hits, in `archive` (a response_archive.ResponseArchive).
+    Pass None to stop archiving.
+    """
+    global _archive
+    _archive = archive
+
+
+def get_archive():
+    return _archive
+
+
+def get_session() -> requests.Session:
+    """
+    Return the shared session, creating it on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            # One keep-alive connection per request we allow in flight
+            adapter = _CountingAdapter(
+                pool_connections=_pool_connections,
+                pool_maxsize=_per_host_limit,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _host_semaphore(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc
+    with _session_lock:
+        if host not in _host_semaphores:
+            _host_semaphores[host] = threading.BoundedSemaphore(_per_host_limit)
+        return _host_semaphores[host]
+
+
+def get_limiter():
+    """
+    Return the shared TokenBucket, or None if rate limiting is disabled.
+    """
+    return _limiter
+
+
+def get_breaker():
+    """
+    Return the shared CircuitBreaker, or None if it is disabled.
+    """
+    return _breaker
+
+
+def loads(body: bytes):
+    """
+    Decode a JSON body, with orjson when it is installed.
+    """
+    return orjson.loads(body) if orjson is not None else json.loads(body)
+
+
+def _release_on_close(response: requests.Response, semaphore):
+    # A streamed response keeps its connection busy until it is closed
+    close = response.close
+    once = threading.Lock()
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            if once.acquire(blocking=False):
+                semaphore.release()
+
+    response.close = close_and_release
+
+
+def _send(payload: dict, stream: bool = False, on_start=None, wait: bool = True):
+    """
+    Send one request while holding a per-host slot. `on_start` is called
+    once the slot is held, right before sending. With wait=False, returns
+    None instead of waiting when no slot is free. With stream=True the slot
+    is held until the response is closed, so body downloads count too.
+    """
+    session = get_session()
+    url = GRAPHQL_URL
+    semaphore = _host_semaphore(url)
+    if not semaphore.acquire(blocking=wait):
+        return None
+    try:
+        if on_start is not None:
+            on_start()
+        stats.record_request()
+        start = time.monotonic()
+        response = session.post(url, json=payload, timeout=_timeout, stream=stream)
+    except BaseException:
+        semaphore.release()
+        raise
+    latencies.record(time.monotonic() - start)
+    if stream:
+        _release_on_close(response, semaphore)
+    else:
+        semaphore.release()
+    return response
+
+
+def _get_hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _session_lock:
+        if _hedge_executor is None:
+            # Every worker's primary request, plus one hedge per host slot
+            workers = _workers or 2 * _per_host_limit
+            _hedge_executor = ThreadPoolExecutor(max_workers=workers + _per_host_limit,
+                                                 thread_name_prefix="ra-hedge")
+        return _hedge_executor
+
+
+def _send_hedge(payload: dict, stream: bool = False):
+    """
+    Send a hedge copy of a request, but only if a host slot is free: when
+    all slots are busy a hedge would just add load, not speed.
+    """
+    if _limiter:
+        _limiter.acquire()
+    return _send(payload, stream, on_start=stats.record_hedge, wait=False)
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None and future.result() is not None:
+        future.result().close()
+
+
+def _send_hedged(payload: dict, stream: bool = False) -> requests.Response:
+    """
+    Send a request; if it is still running after the p95 of recent
+    latencies, send a second copy and return whichever finishes first.
+    """
+    threshold = latencies.percentile(HEDGE_PERCENTILE)
+    if threshold is None:
+        return _send(payload, stream)
+
+    executor = _get_hedge_executor()
+    started = threading.Event()
+    primary = executor.submit(_send, payload, stream, started.set)
+    primary.add_done_callback(lambda future: started.set())
+    # Time the request the way latencies are recorded: from when it holds a
+    # host slot. Waiting for a slot or a pool thread doesn't count.
+    started.wait()
+    try:
+        return primary.result(timeout=threshold)
+    except FutureTimeout:
+        pass
+
+    hedge = executor.submit(_send_hedge, payload, stream)
+    error = None
+    for future in as_completed([primary, hedge]):
+        try:
+            response = future.result()
+        except requests.RequestException as e:
+            error = e
+            continue
+        if response is None:
+            # No free slot, so no hedge was sent
+            continue
+        if future is hedge:
+            stats.record_hedge(won=True)
+        # Release the loser's connection once it finishes
+        other = primary if future is hedge else hedge
+        other.add_done_callback(_close_response)
+        return response
+    raise error
+
+
+def post(payload: dict, stream: bool = False) -> requests.Response:
+    """
+    POST a GraphQL payload through the shared session, holding a per-host
+    slot for the duration of the request. Returns the raw response.
+
+    Requests are paced by the shared rate limiter and bounded by the connect
+    and read timeouts. Throttled (429) and 5xx responses, timeouts,
+    connection errors and (without stream=True) broken transfers are retried
+    with exponential backoff and jitter, honoring Retry-After; the last
+    response is returned (or the last error raised) once retries run out,
+    or at once if Retry-After asks for a wait longer than BACKOFF_MAX.
+    While the circuit breaker is open, CircuitOpenError is raised without
+    sending anything.
+
+    With stream=True the body is not read up front (see requests' stream
+    argument) and the per-host slot is held until the caller closes the
+    response. Failures while the caller reads the body are not retried
+    here; post_graphql_stream reports them as TransferError for
+    retry_transfer.
+    """
+    attempt = 0
+    while True:
+        breaker = _breaker
+        if breaker:
+            breaker.before_request()
+        limiter = _limiter
+        if limiter:
+            limiter.acquire()
+        try:
+            response = _send_hedged(payload, stream) if _hedge else _send(payload, stream)
+        except requests.RequestException:
+            if breaker:
+                breaker.record_failure()
+            if attempt >= _max_retries:
+                raise
+            stats.record_retry(throttled=False)
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            continue
+
+        # Throttling means the endpoint is up, so only 5xx count against the breaker.
+        # A streamed body can still break off, so its success is recorded by
+        # post_graphql_stream once the body has been read. A throttled stream
+        # is closed unread below, so it counts now; otherwise a half-open
+        # breaker would wait for this trial's result forever.
+        if breaker:
+            if response.status_code >= 500:
+                breaker.record_failure()
+            elif not stream or response.status_code in RETRY_STATUSES:
+                breaker.record_success()
+
+        if response.status_code not in RETRY_STATUSES:
+            if limiter:
+                limiter.on_success()
+            return response
+        if attempt >= _max_retries:
+            return response
+
+        throttled = response.status_code == 429
+        retry_after = retry_after_seconds(response)
+        # Don't stall every worker for as long as the server asks (e.g. an
+        # hour); give up on this request once the wait exceeds BACKOFF_MAX
+        giving_up = retry_after is not None and retry_after > BACKOFF_MAX
+        if limiter and throttled:
+            limiter.on_throttled()
+            if retry_after is not None:
+                # Everyone waits, not just this worker
+                limiter.pause(min(retry_after, BACKOFF_MAX))
+        if giving_up:
+            return response
+        stats.record_retry(throttled)
+        response.close()
+        time.sleep(retry_after if retry_after is not None else backoff_delay(attempt))
+        attempt += 1
+
+
+def post_graphql(payload: dict) -> dict:
+    """
+    POST a GraphQL payload and return the decoded JSON response, using the
+    response cache if one is set. Raises requests.HTTPError on non-2xx
+    responses and GraphQLError on responses with errors and no data.
+    """
+    cache = _cache
+    archive = _archive
+    if cache is not None:
+        body = cache.get(payload)
+        if body is not None:
+            if archive is not None:
+                archive.add(payload, body, cached=True)
+            return loads(body)
+
+    response = post(payload)
+    response.raise_for_status()
+    data = loads(response.content)
+    if archive is not None:
+        archive.add(payload, response.content, response.status_code)
+
+    # Don't keep partial or failed results around for the whole TTL
+    if cache is not None and not data.get("errors"):
+        cache.put(payload, response.content)
+
+    check_errors(data)
+    return data
+
+
+def post_graphql_stream(payload: dict, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    POST a GraphQL payload and yield the response body in bytes chunks as it
+    arrives, for incremental decoding (see json_stream). Uses the response
+    cache like post_graphql; bodies larger than STREAM_CACHE_MAX_BYTES are
+    not cached so streaming keeps its memory bound.
+    Raises requests.HTTPError on non-2xx responses.
+
+    A body is only archived once it has been read to the end, so a stream
+    that is abandoned or fails halfway leaves no record behind. A transfer
+    that breaks off counts against the circuit breaker and raises
+    TransferError; see retry_transfer for retrying it.
+    """
+    cache = _cache
+    archive = _archive
+    if cache is not None:
+        body = cache.get(payload)
+        if body is not None:
+            if archive is not None:
+                archive.add(payload, body, cached=True)
+            yield body
+            return
+
+    response = post(payload, stream=True)
+    broke = False
+    try:
+        response.raise_for_status()
+        kept = [] if cache is not None else None
+        record = archive.record(payload, response.status_code) if archive is not None else None
+        size = 0
+        chunks = response.iter_content(chunk_size)
+        while True:
+            try:
+                chunk = next(chunks, None)
+            except requests.RequestException as e:
+                broke = True
+                breaker = _breaker
+                if breaker:
+                    breaker.record_failure()
+                raise TransferError(f"Response body broke off: {e}") from e
+            if chunk is None:
+                break
+            if kept is not None:
+                size += len(chunk)
+                kept.append(chunk)
+                if size > STREAM_CACHE_MAX_BYTES:
+                    kept = None
+            if record is not None:
+                record.write(chunk)
+            yield chunk
+    finally:
+        response.close()
+        # Deferred from post(); a 5xx was already counted as a failure there
+        breaker = _breaker
+        if breaker and not broke and response.status_code < 500:
+            breaker.record_success()
+
+    if record is not None:
+        record.commit()
+
+    if kept is not None:
+        body = b"".join(kept)
+        # An unescaped "errors" can only be the top-level GraphQL errors key
+        # (or a string that is exactly "errors"); skip caching either way
+        if b'"errors"' not in body:
+            cache.put(payload, body)
+
+
+def retry_transfer(read):
+    """
+    Call `read()`, which should stream one response with post_graphql_stream
+    and decode all of it, and call it again with backoff if the body broke
+    off (TransferError), up to the configured number of retries. `read`
+    must not hand anything on before it returns, so a retry never repeats
+    events that were already yielded.
+    """
+    attempt = 0
+    while True:
+        try:
+            return read()
+        except TransferError:
+            if attempt >= _max_retries:
+                raise
+            stats.record_retry(throttled=False)
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
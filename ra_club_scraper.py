@@ -3,40 +3,51 @@ Resident Advisor Club Events Scraper
 Uses RA.co's GraphQL API to fetch events for a specific club/venue.
 
 Usage:
-    python ra_club_scraper.py <club_id> [-o output.csv]
+    python ra_club_scraper.py <club_id> [<club_id> ...] [-o output.csv]
+    python ra_club_scraper.py --clubs-file clubs.txt [--workers 8]
+    python ra_club_scraper.py <club_id> [<club_id> ...] --db events.db
+    python ra_club_scraper.py --clubs-file clubs.txt --archive crawl.gz
+    python ra_club_scraper.py --replay crawl.gz --db events.db
     
 Example:
     python ra_club_scraper.py 105873 -o events.csv
 """
 
-import requests
-import pandas as pd
 import argparse
 import json
+import os
+import sys
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime, timedelta
+from typing import TYPE_CHECKING
 
+import columnar
+import database
+import json_stream
+import ra_client
+import response_archive
+import response_cache
+import writers
+from models import Event
 
-# RA.co GraphQL endpoint
-GRAPHQL_URL = "https://ra.co/graphql"
+if TYPE_CHECKING:
+    # pandas is only imported by the DataFrame-returning functions, so the
+    # command line (which writes files with the stdlib) starts quickly
+    import pandas as pd
 
-# Headers to mimic a browser request
-HEADERS = {
-    "Content-Type": "application/json",
-    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-    "Accept": "application/json",
-    "Accept-Language": "en-US,en;q=0.9",
-    "Origin": "https://ra.co",
-    "Referer": "https://ra.co/",
-}
 
-
-def get_club_events(club_id: int, limit: int = 100) -> dict:
+def get_club_events(club_id: int, limit: int = 100, page: int = 1, stream: bool = False) -> dict:
     """
     Fetch upcoming events for a specific club using RA's GraphQL API.
     
     Args:
         club_id: The RA club ID
-        limit: Max number of events to fetch
+        limit: Page size (max number of events per page)
+        page: 1-based page number
+        stream: Return an iterator over the raw response body chunks instead,
+            to be decoded incrementally by iter_events_stream
     
     Returns:
         Dict containing the GraphQL response
@@ -44,12 +55,12 @@ def get_club_events(club_id: int, limit: int = 100) -> dict:
     
     # GraphQL query for upcoming events
     query = """
-    query GET_VENUE_UPCOMING($id: ID!, $limit: Int) {
+    query GET_VENUE_UPCOMING($id: ID!, $limit: Int, $page: Int) {
         venue(id: $id) {
             id
             name
             address
-            events(type: LATEST, limit: $limit) {
+            events(type: LATEST, limit: $limit, page: $page) {
                 id
                 title
                 date
@@ -71,7 +82,8 @@ def get_club_events(club_id: int, limit: int = 100) -> dict:
     
     variables = {
         "id": str(club_id),
-        "limit": limit
+        "limit": limit,
+        "page": page
     }
     
     payload = {
@@ -79,24 +91,24 @@ def get_club_events(club_id: int, limit: int = 100) -> dict:
         "variables": variables
     }
     
-    response = requests.post(GRAPHQL_URL, headers=HEADERS, json=payload)
-    response.raise_for_status()
-    
-    return response.json()
+    if stream:
+        return ra_client.post_graphql_stream(payload)
+    return ra_client.post_graphql(payload)
 
 
-def get_club_past_events(club_id: int, limit: int = 100) -> dict:
+def get_club_past_events(club_id: int, limit: int = 100, page: int = 1, stream: bool = False) -> dict:
     """
     Fetch past events for a specific club.
+    Arguments and return value are the same as for get_club_events.
     """
     
     query = """
-    query GET_VENUE_PAST($id: ID!, $limit: Int) {
+    query GET_VENUE_PAST($id: ID!, $limit: Int, $page: Int) {
         venue(id: $id) {
             id
             name
             address
-            events(type: PREVIOUS, limit: $limit) {
+            events(type: PREVIOUS, limit: $limit, page: $page) {
                 id
                 title
                 date
@@ -118,7 +130,8 @@ def get_club_past_events(club_id: int, limit: int = 100) -> dict:
     
     variables = {
         "id": str(club_id),
-        "limit": limit
+        "limit": limit,
+        "page": page
     }
     
     payload = {
@@ -126,132 +139,713 @@ def get_club_past_events(club_id: int, limit: int = 100) -> dict:
         "variables": variables
     }
     
-    response = requests.post(GRAPHQL_URL, headers=HEADERS, json=payload)
-    response.raise_for_status()
+    if stream:
+        return ra_client.post_graphql_stream(payload)
+    return ra_client.post_graphql(payload)
+
+
+# Event fields shared by the aliased and batched queries
+EVENT_FIELDS_FRAGMENT = """
+    fragment EventFields on Event {
+        id
+        title
+        date
+        startTime
+        endTime
+        contentUrl
+        flyerFront
+        artists {
+            id
+            name
+        }
+        pick {
+            blurb
+        }
+    }
+"""
+
+
+def get_club_all_events(club_id: int, limit: int = 100, page: int = 1) -> dict:
+    """
+    Fetch upcoming and past events for a club in a single request.
+    The two event lists are returned under the aliases 'upcoming' and 'past'.
+    """
     
-    return response.json()
+    query = """
+    query GET_VENUE_EVENTS($id: ID!, $limit: Int, $page: Int) {
+        venue(id: $id) {
+            id
+            name
+            address
+            upcoming: events(type: LATEST, limit: $limit, page: $page) {
+                ...EventFields
+            }
+            past: events(type: PREVIOUS, limit: $limit, page: $page) {
+                ...EventFields
+            }
+        }
+    }
+    """ + EVENT_FIELDS_FRAGMENT
+    
+    variables = {
+        "id": str(club_id),
+        "limit": limit,
+        "page": page
+    }
+    
+    payload = {
+        "query": query,
+        "variables": variables
+    }
+    
+    return ra_client.post_graphql(payload)
+
+
+def venue_alias(club_id) -> str:
+    """
+    Alias used for a venue in batched queries, e.g. 105873 -> "v105873".
+    """
+    return f"v{int(club_id)}"
 
 
-def parse_events(response_data: dict) -> list:
+def build_batch_query(club_ids: list, include_past: bool = False, limit: int = 100,
+                      page: int = 1) -> dict:
     """
-    Parse the GraphQL response into a list of event dictionaries.
+    Build one GraphQL payload requesting several venues under aliases.
     
     Args:
-        response_data: The GraphQL response
+        club_ids: The RA club IDs to include
+        include_past: Also request each venue's past events
+        limit: Page size for each event list
+        page: 1-based page number
     
     Returns:
-        List of event dictionaries
+        Payload dict with 'query' and 'variables'
     """
-    events = []
+    lists = "upcoming: events(type: LATEST, limit: $limit, page: $page) { ...EventFields }"
+    if include_past:
+        lists += "\n            past: events(type: PREVIOUS, limit: $limit, page: $page) { ...EventFields }"
+    
+    aliases = [venue_alias(club_id) for club_id in club_ids]
+    declarations = "".join(f", ${alias}: ID!" for alias in aliases)
+    selections = "".join(f"""
+        {alias}: venue(id: ${alias}) {{
+            id
+            name
+            address
+            {lists}
+        }}""" for alias in aliases)
     
-    venue_data = response_data.get("data", {}).get("venue")
+    query = f"""
+    query GET_VENUES_BATCH($limit: Int, $page: Int{declarations}) {{{selections}
+    }}
+    """ + EVENT_FIELDS_FRAGMENT
+    
+    variables = {"limit": limit, "page": page}
+    for alias, club_id in zip(aliases, club_ids):
+        variables[alias] = str(club_id)
+    
+    return {
+        "query": query,
+        "variables": variables
+    }
+
+
+def get_clubs_events_batch(club_ids: list, include_past: bool = False, limit: int = 100,
+                           page: int = 1, stream: bool = False) -> dict:
+    """
+    Fetch events for several clubs in a single request (see build_batch_query).
+    With stream=True, returns an iterator over the raw response body chunks.
+    """
+    payload = build_batch_query(club_ids, include_past, limit, page)
+    if stream:
+        return ra_client.post_graphql_stream(payload)
+    return ra_client.post_graphql(payload)
+
+
+def split_venue_responses(response_data: dict) -> dict:
+    """
+    Split a batched response into single-venue responses keyed by alias.
+    A plain single-venue response is returned under the key 'venue'.
+    Venues that could not be resolved (null in the response) map to None.
+    """
+    data = response_data.get("data") or {}
+    return {
+        alias: {"data": {"venue": venue_data}} if venue_data else None
+        for alias, venue_data in data.items()
+    }
+
+
+# Keys under which a venue's event lists can appear: plain 'events' for the
+# single-list queries, 'upcoming'/'past' aliases for GET_VENUE_EVENTS
+EVENT_LIST_KEYS = ("events", "upcoming", "past")
+
+
+def iter_events(response_data: dict, event_list: str = None):
+    """
+    Yield normalized Event records from a GraphQL response one at a time.
+    Batched responses (aliased venues) are walked venue by venue.
+    
+    Args:
+        response_data: The GraphQL response
+        event_list: Only parse this event list ('events', 'upcoming' or 'past').
+            By default all lists present in the response are parsed.
+    """
+    data = response_data.get("data") or {}
+    if "venue" not in data:
+        # Batched response: one aliased venue per key
+        for venue_response in split_venue_responses(response_data).values():
+            if venue_response:
+                yield from iter_events(venue_response, event_list)
+        return
+    
+    venue_data = data.get("venue")
     if not venue_data:
-        return events
+        return
     
     venue_name = venue_data.get("name", "")
     venue_address = venue_data.get("address", "")
+    venue_id = venue_data.get("id")
     
-    # Events list is directly in 'events', no 'data' wrapper anymore
-    events_list = venue_data.get("events", [])
-    
-    for event in events_list:
-        # Extract artist names
-        artists = event.get("artists", []) or []
-        artist_names = ", ".join([a.get("name", "") for a in artists if a.get("name")])
-        
-        # Get description from pick blurb if available
-        description = ""
-        if event.get("pick") and event["pick"].get("blurb"):
-            description = event["pick"]["blurb"]
-        
-        events.append({
-            "event_id": event.get("id"),
-            "title": event.get("title"),
-            "date": event.get("date"),
-            "start_time": event.get("startTime"),
-            "end_time": event.get("endTime"),
-            "venue": venue_name,
-            "venue_address": venue_address,
-            "performers": artist_names,
-            "description": description,
-            "url": f"https://ra.co{event.get('contentUrl', '')}" if event.get("contentUrl") else "",
-            "flyer_url": event.get("flyerFront", "")
-        })
+    # Events lists are directly on the venue, no 'data' wrapper anymore
+    keys = [event_list] if event_list else EVENT_LIST_KEYS
+    for key in keys:
+        for event in venue_data.get(key) or []:
+            yield normalize_event(event, venue_name, venue_address, venue_id)
+
+
+def normalize_event(event: dict, venue_name: str, venue_address: str, venue_id: str = None) -> Event:
+    """
+    Turn one raw GraphQL event into the flat Event record used for CSV/JSON/SQLite.
+    """
+    # Extract artist names
+    artists = event.get("artists", []) or []
+    artist_names = ", ".join([a.get("name", "") for a in artists if a.get("name")])
     
-    return events
+    # Get description from pick blurb if available
+    description = ""
+    if event.get("pick") and event["pick"].get("blurb"):
+        description = event["pick"]["blurb"]
+    
+    return Event(
+        event_id=event.get("id"),
+        title=event.get("title"),
+        date=event.get("date"),
+        start_time=event.get("startTime"),
+        end_time=event.get("endTime"),
+        venue=venue_name,
+        venue_address=venue_address,
+        performers=artist_names,
+        description=description,
+        content_url=event.get("contentUrl") or "",
+        flyer_url=event.get("flyerFront", ""),
+        artists=[(a.get("id"), a.get("name")) for a in artists if a.get("name")],
+        venue_id=venue_id
+    )
 
 
-def fetch_all_club_events(club_id: int, include_past: bool = False, max_pages: int = 10) -> pd.DataFrame:
+def parse_events(response_data: dict, event_list: str = None) -> list:
     """
-    Fetch all events (upcoming and optionally past) for a club.
+    Parse the GraphQL response into a list of Event records.
+    Thin wrapper over iter_events; see there for the arguments.
+    
+    Returns:
+        List of Event records
+    """
+    return list(iter_events(response_data, event_list))
+
+
+def events_frame(events) -> "pd.DataFrame":
+    """
+    Build a DataFrame (columns in Event.FIELDS order) from an iterable of Event records.
+    """
+    import pandas as pd
+    return pd.DataFrame.from_records((event.as_row() for event in events), columns=Event.FIELDS)
+
+
+def iter_events_stream(chunks, event_list: str = None):
+    """
+    Like iter_events, but decodes the response body incrementally from an
+    iterator of bytes chunks, yielding each event while the rest of the body
+    is still arriving. The body is never held in memory as a whole.
+    """
+    for _, venue, key, event in json_stream.iter_venue_events(chunks):
+        if key not in EVENT_LIST_KEYS or (event_list and key != event_list):
+            continue
+        yield normalize_event(event, venue.get("name", ""), venue.get("address", ""), venue.get("id"))
+
+
+def group_events_stream(chunks) -> dict:
+    """
+    Decode a (batched) response body incrementally and group its events.
+    
+    Returns:
+        Dict mapping venue key ('venue' or batch alias) -> dict of event list
+        key -> list of Event records
+    """
+    groups = {}
+    for venue_key, venue, key, event in json_stream.iter_venue_events(chunks):
+        if key not in EVENT_LIST_KEYS:
+            continue
+        lists = groups.setdefault(venue_key, {})
+        lists.setdefault(key, []).append(
+            normalize_event(event, venue.get("name", ""), venue.get("address", ""), venue.get("id"))
+        )
+    return groups
+
+
+# Number of events requested per page
+PAGE_SIZE = 50
+
+
+class IncrementalWindow:
+    """
+    Limits which events are fetched in incremental mode.
+    
+    Past events are assumed to be listed newest first and upcoming events
+    soonest first, so paging can stop at the first event outside the window:
+    past events older than the venue's high-water mark (the latest past event
+    already stored) and upcoming events beyond `horizon_days` from now.
+    
+    Args:
+        high_water_marks: Dict mapping club ID (RA venue id) -> ISO date, as
+            returned by database.get_high_water_marks. Venues stored without
+            an id are looked up by name.
+        horizon_days: How far ahead upcoming events are re-checked (None = no limit)
+    """
+    
+    def __init__(self, high_water_marks: dict = None, horizon_days: int = None):
+        self.high_water_marks = high_water_marks or {}
+        self.until = None
+        if horizon_days is not None:
+            self.until = (datetime.now() + timedelta(days=horizon_days)).strftime("%Y-%m-%dT23:59:59")
+    
+    def cutoff(self, club_id: int, venue_name: str, event_list: str):
+        """
+        Return the date bound for one event list of a venue, or None if unbounded.
+        """
+        if event_list == "past":
+            return self.high_water_marks.get(str(club_id)) or self.high_water_marks.get(venue_name)
+        return self.until
+    
+    @staticmethod
+    def trim(events: list, event_list: str, cutoff: str):
+        """
+        Drop events beyond `cutoff`.
+        Returns (events, reached) where `reached` means later pages are all out of the window.
+        """
+        if not cutoff:
+            return events, False
+        if event_list == "past":
+            # Events on the high-water date itself are re-checked, they may still be edited
+            kept = [e for e in events if (e.date or "") >= cutoff]
+        else:
+            kept = [e for e in events if (e.date or "") <= cutoff]
+        return kept, len(kept) < len(events)
+
+
+def _venue_name(response_data: dict) -> str:
+    venue_data = (response_data.get("data") or {}).get("venue") or {}
+    return venue_data.get("name", "")
+
+
+def iter_list_pages(club_id: int, event_list: str, start_page: int = 2, max_pages: int = 10,
+                    page_size: int = PAGE_SIZE, cutoff: str = None):
+    """
+    Yield one page of events at a time from a single event list of a club.
+    Stops after `max_pages` pages, at the first page shorter than `page_size`,
+    or at the first page reaching `cutoff` (see IncrementalWindow).
+    
+    Args:
+        club_id: The RA club ID
+        event_list: 'upcoming' (or 'events') for upcoming events, 'past' for past events
+        start_page: First page number to request
+        max_pages: Last page number to request
+        page_size: Number of events per page
+        cutoff: Optional date bound for incremental fetching
+    """
+    fetch = get_club_past_events if event_list == "past" else get_club_events
+    for page in range(start_page, max_pages + 1):
+        events = ra_client.retry_transfer(lambda: list(iter_events_stream(
+            fetch(club_id, limit=page_size, page=page, stream=True), "events"
+        )))
+        full = len(events) == page_size
+        events, reached = IncrementalWindow.trim(events, event_list, cutoff)
+        yield events
+        if not full or reached:
+            return
+
+
+def iter_club_event_pages(club_id: int, include_past: bool = False, max_pages: int = 10,
+                          page_size: int = PAGE_SIZE, window: IncrementalWindow = None):
+    """
+    Yield (category, events) for each page of a club's events as it arrives.
+    The first pages of upcoming and past events share one aliased request;
+    further pages are only requested for lists whose previous page was full
+    and, in incremental mode, still inside the window.
+    """
+    if include_past:
+        first_page = get_club_all_events(club_id, limit=page_size, page=1)
+        venue_name = _venue_name(first_page)
+        first_lists = [(label, parse_events(first_page, event_list=label)) for label in ("upcoming", "past")]
+    else:
+        events = ra_client.retry_transfer(lambda: list(iter_events_stream(
+            get_club_events(club_id, limit=page_size, page=1, stream=True), "events"
+        )))
+        venue_name = events[0].venue if events else ""
+        first_lists = [("upcoming", events)]
+    
+    for label, events in first_lists:
+        full = len(events) == page_size
+        cutoff = window.cutoff(club_id, venue_name, label) if window else None
+        events, reached = IncrementalWindow.trim(events, label, cutoff)
+        yield label, events
+        if full and not reached:
+            for events in iter_list_pages(club_id, label, 2, max_pages, page_size, cutoff):
+                yield label, events
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+def iter_club_events(club_id: int, include_past: bool = False, max_pages: int = 10,
+                     window: IncrementalWindow = None, verbose: bool = False):
+    """
+    Yield a club's events (upcoming and optionally past) one at a time as
+    their pages arrive. A request error is printed and ends the stream;
+    events from pages that arrived before it have already been yielded.
     
     Args:
         club_id: The RA club ID
         include_past: Whether to include past events
-        max_pages: Used to calculate limit (50 * max_pages) to mimic old behavior
+        max_pages: Maximum number of pages of PAGE_SIZE events per category
+        window: Only fetch events inside this incremental window
+        verbose: Print progress messages
+    """
+    log = print if verbose else _quiet
+    
+    if include_past:
+        log(f"Fetching upcoming and past events for club {club_id}...")
+        counts = {"upcoming": 0, "past": 0}
+    else:
+        log(f"Fetching upcoming events for club {club_id}...")
+        counts = {"upcoming": 0}
+    
+    try:
+        for label, events in iter_club_event_pages(club_id, include_past, max_pages, window=window):
+            counts[label] += len(events)
+            yield from events
+    except Exception as e:
+        print(f"  Error fetching events for club {club_id}: {e}")
+    
+    for label, count in counts.items():
+        if count:
+            log(f"  Found {count} {label} events")
+        else:
+            log(f"  No {label} events found")
+
+
+def fetch_all_club_events(club_id: int, include_past: bool = False, max_pages: int = 10,
+                          verbose: bool = True, window: IncrementalWindow = None) -> "pd.DataFrame":
+    """
+    Fetch all events (upcoming and optionally past) for a club.
+    DataFrame wrapper over iter_club_events; see there for the arguments.
     
     Returns:
         DataFrame containing all events
     """
-    all_events = []
-    limit = max_pages * 50
+    df = events_frame(iter_club_events(club_id, include_past, max_pages, window, verbose))
+    
+    # Sort by date
+    if not df.empty and "date" in df.columns:
+        df = df.sort_values("date", ascending=False)
+    
+    return df
+
+
+def read_club_ids(path: str) -> list:
+    """
+    Read club IDs from a text file.
+    Accepts one ID per line (or comma/whitespace separated); '#' starts a comment.
+    """
+    club_ids = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for token in line.replace(",", " ").split():
+                club_ids.append(int(token))
+    return club_ids
+
+
+class AdaptiveBatchSizer:
+    """
+    Picks how many venues go into the next batched request.
+    
+    The size shrinks multiplicatively when a batch fails and when responses
+    carry more events than `target_events`, and grows additively while
+    responses stay comfortably below the target.
+    """
+    
+    def __init__(self, initial: int = 10, minimum: int = 1, maximum: int = 50,
+                 target_events: int = 2000):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_events = target_events
+        self.size = max(minimum, min(initial, maximum))
+        self._lock = threading.Lock()
     
-    # Fetch upcoming events
-    print(f"Fetching upcoming events for club {club_id}...")
+    def record_success(self, batch_len: int, event_count: int):
+        with self._lock:
+            if event_count > self.target_events:
+                # Scale towards the venue count that would have hit the target
+                per_venue = event_count / max(1, batch_len)
+                self.size = max(self.minimum, min(self.size, int(self.target_events / per_venue)))
+            elif event_count < self.target_events / 2 and batch_len >= self.size:
+                self.size = min(self.maximum, self.size + max(1, self.size // 4))
+    
+    def record_failure(self):
+        with self._lock:
+            self.size = max(self.minimum, self.size // 2)
+
+
+def _fetch_remaining_pages(club_id: int, event_list: str, max_pages: int, page_size: int,
+                           cutoff: str = None) -> list:
+    """
+    Fetch pages 2..max_pages of one event list, keeping the pages that
+    arrived before an error.
+    """
+    events = []
     try:
-        response = get_club_events(club_id, limit=limit)
-        events = parse_events(response)
-        
-        if events:
-            all_events.extend(events)
-            print(f"  Found {len(events)} upcoming events")
-        else:
-            print("  No upcoming events found")
-            
+        for page in iter_list_pages(club_id, event_list, 2, max_pages, page_size, cutoff):
+            events.extend(page)
     except Exception as e:
-        print(f"  Error fetching upcoming events: {e}")
+        print(f"  Error fetching {event_list} events for club {club_id}: {e}")
+    return events
+
+
+def _fetch_batch_grouped(club_ids: list, include_past: bool) -> dict:
+    """
+    Fetch the first page of a batch and decode it while it streams in,
+    in the worker thread. Returns group_events_stream's alias -> lists mapping.
+    """
+    return ra_client.retry_transfer(lambda: group_events_stream(
+        get_clubs_events_batch(club_ids, include_past, PAGE_SIZE, 1, stream=True)
+    ))
+
+
+def _iter_batched(club_ids: list, include_past: bool, max_pages: int, workers: int,
+                  batch_size: int, log, window: IncrementalWindow = None):
+    """
+    Fetch clubs in aliased multi-venue requests, keeping up to `workers`
+    batches in flight. A failed batch is split in half and retried, down to
+    single venues. Lists whose first page came back full are continued page
+    by page per venue. Yields lists of events as responses arrive.
+    """
+    sizer = AdaptiveBatchSizer(initial=batch_size, maximum=max(batch_size, 50))
+    pending = deque(club_ids)
+    retries = deque()
+    in_flight = {}
     
-    # Fetch past events
-    if include_past:
-        print(f"Fetching past events for club {club_id}...")
-        try:
-            response = get_club_past_events(club_id, limit=limit)
-            events = parse_events(response)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        while pending or retries or in_flight:
+            while (pending or retries) and len(in_flight) < max(1, workers):
+                if retries:
+                    batch = retries.popleft()
+                else:
+                    batch = [pending.popleft() for _ in range(min(sizer.size, len(pending)))]
+                future = executor.submit(_fetch_batch_grouped, batch, include_past)
+                in_flight[future] = batch
             
-            if events:
-                all_events.extend(events)
-                print(f"  Found {len(events)} past events")
-            else:
-                print("  No past events found")
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = in_flight.pop(future)
+                
+                if isinstance(batch, tuple):
+                    # Continuation pages of a single venue's list
+                    club_id, event_list = batch
+                    events = future.result()
+                    log(f"  Club {club_id}: {len(events)} more {event_list} events")
+                    yield events
+                    continue
                 
-        except Exception as e:
-            print(f"  Error fetching past events: {e}")
+                try:
+                    groups = future.result()
+                except (ra_client.CircuitOpenError, ra_client.GraphQLError) as e:
+                    # Splitting won't help while the endpoint is failing fast
+                    # or rejects the query itself
+                    print(f"  Error fetching clubs {', '.join(map(str, batch))}: {e}")
+                    continue
+                except Exception as e:
+                    sizer.record_failure()
+                    if len(batch) > 1:
+                        half = len(batch) // 2
+                        retries.extend([batch[:half], batch[half:]])
+                    else:
+                        print(f"  Error fetching club {batch[0]}: {e}")
+                    continue
+                
+                event_count = 0
+                for club_id in batch:
+                    lists = groups.get(venue_alias(club_id), {})
+                    venue_events = 0
+                    for event_list in ("upcoming", "past"):
+                        events = lists.get(event_list, [])
+                        full = len(events) == PAGE_SIZE
+                        cutoff = None
+                        if window and events:
+                            cutoff = window.cutoff(club_id, events[0].venue, event_list)
+                        events, reached = IncrementalWindow.trim(events, event_list, cutoff)
+                        venue_events += len(events)
+                        yield events
+                        if full and not reached and max_pages > 1:
+                            future = executor.submit(_fetch_remaining_pages, club_id, event_list,
+                                                     max_pages, PAGE_SIZE, cutoff)
+                            in_flight[future] = (club_id, event_list)
+                    event_count += venue_events
+                    log(f"  Club {club_id}: {venue_events} events")
+                sizer.record_success(len(batch), event_count)
+
+
+def _collect_club_events(club_id: int, include_past: bool, max_pages: int,
+                         window: IncrementalWindow = None) -> list:
+    return list(iter_club_events(club_id, include_past, max_pages, window))
+
+
+def _iter_per_venue(club_ids: list, include_past: bool, max_pages: int, workers: int,
+                    log, window: IncrementalWindow = None):
+    """
+    Fetch clubs one request chain per venue, `workers` venues at a time.
+    Yields each club's list of events as it finishes.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(_collect_club_events, club_id, include_past, max_pages, window): club_id
+            for club_id in club_ids
+        }
+        for future in as_completed(futures):
+            club_id = futures[future]
+            try:
+                events = future.result()
+            except Exception as e:
+                print(f"  Error fetching club {club_id}: {e}")
+                continue
+            log(f"  Club {club_id}: {len(events)} events")
+            yield events
+
+
+def iter_many_club_events(club_ids: list, include_past: bool = False, max_pages: int = 10,
+                          workers: int = 8, verbose: bool = True,
+                          batch_size: int = 1, window: IncrementalWindow = None):
+    """
+    Fetch events for several clubs concurrently through a bounded worker pool
+    and yield them one at a time, in arrival order, as responses come in.
+    Requests to the same host are additionally capped by the per-host limit.
     
-    # Create DataFrame
-    df = pd.DataFrame(all_events)
+    Args:
+        club_ids: RA club IDs to fetch
+        include_past: Whether to include past events
+        max_pages: Maximum number of pages of PAGE_SIZE events per category
+        workers: Number of requests in flight at the same time
+        verbose: Print a line per club as it finishes
+        batch_size: Initial number of venues per request. Values above 1
+            enable aliased multi-venue queries whose size adapts to response
+            size and errors; 1 sends one request per venue.
+        window: Only fetch events inside this incremental window
+    """
+    # Keep the first occurrence of each ID so duplicates don't cost a request
+    club_ids = list(dict.fromkeys(club_ids))
+    log = print if verbose else _quiet
+    
+    if batch_size > 1:
+        pages = _iter_batched(club_ids, include_past, max_pages, workers, batch_size, log, window)
+    else:
+        pages = _iter_per_venue(club_ids, include_past, max_pages, workers, log, window)
+    
+    # The same event can be listed by more than one club (e.g. co-hosted nights)
+    seen = set()
+    for events in pages:
+        for event in events:
+            if event.event_id in seen:
+                continue
+            seen.add(event.event_id)
+            yield event
+
+
+def fetch_many_club_events(club_ids: list, include_past: bool = False, max_pages: int = 10,
+                           workers: int = 8, verbose: bool = True,
+                           batch_size: int = 1, window: IncrementalWindow = None) -> "pd.DataFrame":
+    """
+    Fetch events for several clubs concurrently.
+    DataFrame wrapper over iter_many_club_events; see there for the arguments.
+    
+    Returns:
+        Single DataFrame with the events of all clubs, sorted by date
+    """
+    df = events_frame(iter_many_club_events(
+        club_ids, include_past, max_pages, workers, verbose, batch_size, window
+    ))
     
-    # Sort by date
     if not df.empty and "date" in df.columns:
         df = df.sort_values("date", ascending=False)
     
     return df
 
 
+def iter_archived_events(archive_path: str, verbose: bool = True):
+    """
+    Re-parse the responses stored in a response archive (see --archive) and
+    yield their events, offline. An event that appears in more than one
+    response is yielded once, as it was in the latest response: records are
+    read oldest first, so a later crawl's version of an event replaces the
+    one from an earlier crawl. Events are only yielded once the whole archive
+    has been read.
+    
+    Args:
+        archive_path: Archive written by response_archive.ResponseArchive
+        verbose: Print a summary line once the archive has been read
+    """
+    stats = {}
+    responses = 0
+    latest = {}
+    for _, body in response_archive.iter_records(archive_path, stats):
+        responses += 1
+        for event in parse_events(ra_client.loads(body)):
+            # Re-insert so the event is ordered by the response it last appeared in
+            latest.pop(event.event_id, None)
+            latest[event.event_id] = event
+    yield from latest.values()
+    
+    if verbose:
+        print(f"Replayed {responses} responses from {archive_path}")
+    if stats["damaged"]:
+        print(f"  Skipped {stats['damaged']} damaged records in {archive_path}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Scrape event data from a Resident Advisor club page"
     )
     parser.add_argument(
-        "club_id",
+        "club_ids",
         type=int,
-        nargs="?",
-        default=105873,
-        help="The club ID from the RA URL (e.g., 105873 from ra.co/clubs/105873)"
+        nargs="*",
+        metavar="club_id",
+        help="One or more club IDs from the RA URL (e.g., 105873 from ra.co/clubs/105873). Default: 105873"
+    )
+    parser.add_argument(
+        "--clubs-file",
+        help="File with club IDs to fetch (one per line, '#' for comments)"
     )
     parser.add_argument(
         "-o", "--output",
-        default="events.csv",
-        help="Output file path (default: events.csv). Supports .csv and .json"
+        default=None,
+        help="Output file path (default: events.csv unless --db is given). Supports .csv, .json, .jsonl, .parquet and .feather"
+    )
+    parser.add_argument(
+        "--append",
+        action="store_true",
+        help="Add to an existing .jsonl output instead of overwriting it, skipping events already in it"
     )
     parser.add_argument(
         "--include-past",
@@ -262,36 +856,256 @@ def main():
         "--max-pages",
         type=int,
         default=10,
-        help="Maximum number of pages to fetch per category (default: 10)"
+        help=f"Maximum number of pages of {PAGE_SIZE} events to fetch per category (default: 10)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch past events newer than those already in --db and "
+             "upcoming events within --horizon-days"
+    )
+    parser.add_argument(
+        "--db",
+        help="Write events straight into this SQLite database (also read for --incremental)"
+    )
+    parser.add_argument(
+        "--horizon-days",
+        type=int,
+        default=90,
+        help="In incremental mode, how many days ahead upcoming events are re-checked (default: 90)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of clubs fetched concurrently (default: 8)"
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=ra_client.DEFAULT_PER_HOST_LIMIT,
+        help=f"Maximum concurrent requests per host (default: {ra_client.DEFAULT_PER_HOST_LIMIT})"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=ra_client.DEFAULT_RATE,
+        help="Starting request rate in requests/second, shared by all workers; adapts to throttling. "
+             f"0 disables rate limiting (default: {ra_client.DEFAULT_RATE})"
+    )
+    parser.add_argument(
+        "--max-rate",
+        type=float,
+        default=ra_client.DEFAULT_MAX_RATE,
+        help=f"Upper bound for the adaptive request rate (default: {ra_client.DEFAULT_MAX_RATE})"
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=ra_client.DEFAULT_MAX_RETRIES,
+        help="Retries for throttled (429), 5xx and failed requests, with exponential backoff "
+             f"(default: {ra_client.DEFAULT_MAX_RETRIES})"
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=ra_client.DEFAULT_CONNECT_TIMEOUT,
+        help=f"Seconds to wait for a connection to RA (default: {ra_client.DEFAULT_CONNECT_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=ra_client.DEFAULT_READ_TIMEOUT,
+        help=f"Seconds to wait for RA to send data (default: {ra_client.DEFAULT_READ_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=ra_client.DEFAULT_BREAKER_THRESHOLD,
+        help="Consecutive failures after which requests fail fast for --breaker-cooldown seconds; "
+             f"0 disables the circuit breaker (default: {ra_client.DEFAULT_BREAKER_THRESHOLD})"
+    )
+    parser.add_argument(
+        "--breaker-cooldown",
+        type=float,
+        default=ra_client.DEFAULT_BREAKER_COOLDOWN,
+        help=f"Seconds the circuit stays open before a trial request (default: {ra_client.DEFAULT_BREAKER_COOLDOWN})"
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a second copy of a request that runs past the p95 latency and use whichever returns first"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=response_cache.DEFAULT_CACHE_DIR,
+        help=f"Directory for the on-disk response cache (default: {response_cache.DEFAULT_CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help=f"Override the cache TTL in seconds for all queries "
+             f"(default: {response_cache.DEFAULT_TTL // 60} min for upcoming, 24 h for past events)"
+    )
+    parser.add_argument(
+        "--cache-size-mb",
+        type=int,
+        default=response_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="Cache size limit in MB; least recently used responses are evicted "
+             f"(default: {response_cache.DEFAULT_MAX_BYTES // (1024 * 1024)})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch from RA and don't store responses"
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="Append every raw GraphQL response, with its request metadata, to this compressed archive"
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Don't fetch anything: re-parse the responses in this archive (see --archive) "
+             "and save their events to the usual outputs"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=10,
+        help="Initial number of venues requested per GraphQL query when fetching several clubs; "
+             "adapts to response size and errors. Use 1 for one request per venue (default: 10)"
     )
     
     args = parser.parse_args()
     
-    # Fetch events
-    df = fetch_all_club_events(
-        club_id=args.club_id,
-        include_past=args.include_past,
-        max_pages=args.max_pages
+    club_ids = list(args.club_ids)
+    if args.clubs_file:
+        club_ids.extend(read_club_ids(args.clubs_file))
+    if not club_ids:
+        club_ids = [105873]
+    
+    ra_client.configure(
+        per_host=args.per_host,
+        rate=args.rate,
+        max_rate=args.max_rate,
+        max_retries=args.max_retries,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        breaker_threshold=args.breaker_threshold,
+        breaker_cooldown=args.breaker_cooldown,
+        hedge=args.hedge,
+        workers=args.workers
     )
+    if args.replay:
+        if args.archive or args.incremental:
+            parser.error("--replay can't be combined with --archive or --incremental")
+        if not os.path.isfile(args.replay):
+            print(f"Error: archive '{args.replay}' not found.")
+            sys.exit(1)
+    elif not args.no_cache:
+        cache_options = {"max_bytes": args.cache_size_mb * 1024 * 1024}
+        if args.cache_ttl is not None:
+            cache_options.update(default_ttl=args.cache_ttl, ttls={})
+        ra_client.set_cache(response_cache.ResponseCache(args.cache_dir, **cache_options))
+    if args.archive:
+        ra_client.set_archive(response_archive.ResponseArchive(args.archive))
     
-    print(f"\nTotal events found: {len(df)}")
+    output_path = args.output
+    if not output_path and not args.db:
+        output_path = "events.csv"
+    if output_path and output_path.endswith(columnar.EXTENSIONS):
+        # Fail now rather than after the whole crawl
+        try:
+            columnar.require()
+        except ImportError as e:
+            parser.error(str(e))
+    streaming_output = bool(output_path) and output_path.endswith(".jsonl")
+    if args.append and not streaming_output:
+        parser.error("--append requires a .jsonl output file")
+    
+    window = None
+    if args.incremental:
+        if not args.db:
+            parser.error("--incremental requires --db")
+        window = IncrementalWindow(database.get_high_water_marks(args.db), args.horizon_days)
     
-    if df.empty:
+    # Fetch events
+    if args.replay:
+        events = iter_archived_events(args.replay)
+    elif len(club_ids) == 1:
+        events = iter_club_events(
+            club_ids[0],
+            include_past=args.include_past,
+            max_pages=args.max_pages,
+            window=window,
+            verbose=True
+        )
+    else:
+        events = iter_many_club_events(
+            club_ids,
+            include_past=args.include_past,
+            max_pages=args.max_pages,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            window=window
+        )
+    
+    # .jsonl output and the database take events as they are parsed; other
+    # (sorted) files need them all in memory first
+    total = None
+    jsonl = None
+    if streaming_output:
+        jsonl = writers.JsonlWriter(output_path, append=args.append)
+        events = jsonl.tee(events)
+    elif output_path:
+        events = writers.sort_events(events)
+        total = len(events)
+    saved = {}
+    try:
+        if args.db:
+            saved = database.stream_events(events, args.db)
+        elif jsonl:
+            for _ in events:
+                pass
+    finally:
+        if jsonl:
+            jsonl.close()
+    if jsonl:
+        total = jsonl.written + jsonl.skipped
+    elif total is None:
+        total = sum(sum(counts.values()) for counts in saved.values())
+    
+    print(f"\nTotal events found: {total}")
+    if not args.replay:
+        print(f"HTTP: {ra_client.stats.summary()}")
+    if ra_client.get_cache() is not None:
+        print(f"Cache: {ra_client.get_cache().summary()}")
+    if ra_client.get_archive() is not None:
+        ra_client.get_archive().close()
+        print(f"Archive: {ra_client.get_archive().summary()}")
+    for venue, counts in saved.items():
+        print(f"Saved {sum(counts.values())} events for venue {database.format_venue(venue)} in {args.db} "
+              f"({database.format_counts(counts)})")
+    
+    if not total:
         print("No events found. The club ID might be invalid or there are no events.")
         return
+    if jsonl:
+        print(f"Events saved to: {output_path} ({jsonl.written} new, {jsonl.skipped} already in the file)")
+        return
+    if not output_path:
+        return
     
-    # Save to file
-    output_path = args.output
-    if output_path.endswith(".json"):
-        df.to_json(output_path, orient="records", indent=2)
-    else:
-        df.to_csv(output_path, index=False)
+    # Save to file (.csv, .json, .jsonl, .parquet or .feather)
+    writers.write_events(events, output_path)
     
     print(f"Events saved to: {output_path}")
     
     # Print sample
     print("\nSample of fetched data:")
-    print(df[["date", "title", "performers"]].head(5).to_string())
+    print(writers.format_sample(events))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+"""
+Append-only archive of raw GraphQL responses.
+
+Every response body the scraper parses is stored together with its request
+metadata, so the parser and the database load can be re-run later from disk
+(see ra_club_scraper.py --replay) without touching the network.
+
+Each record is one gzip member holding a JSON header line followed by the
+response body, and members are simply concatenated. The archive is therefore
+a valid .gz file (`zcat archive.gz` prints every record), appending never
+rewrites earlier data, and a reader can find record boundaries without an
+index. A record only reaches the file once its body is complete, in a single
+write, so concurrent workers never interleave.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+
+from response_cache import cache_key, operation_name
+
+# Compression level for new records; 6 is zlib's speed/size sweet spot
+COMPRESS_LEVEL = 6
+
+# Bytes read at a time when replaying
+READ_CHUNK_SIZE = 256 * 1024
+
+# zlib window bits for gzip framing (header and CRC trailer)
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+GZIP_MAGIC = b"\x1f\x8b\x08"
+
+
+class ArchiveRecord:
+    """
+    One response being archived. Body chunks are compressed as they are
+    added; nothing is written to the archive until commit().
+    """
+
+    def __init__(self, archive, payload: dict, status: int = 200, cached: bool = False):
+        self._archive = archive
+        self._compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+        self._parts = []
+        self.size = 0
+        header = {
+            "fetched_at": time.time(),
+            "operation": operation_name(payload.get("query")),
+            "variables": payload.get("variables") or {},
+            "key": cache_key(payload),
+            "status": status,
+            "cached": cached,
+        }
+        self._parts.append(self._compressor.compress(json.dumps(header).encode() + b"\n"))
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        self._parts.append(self._compressor.compress(chunk))
+
+    def commit(self):
+        self._parts.append(self._compressor.flush())
+        self._archive._append(b"".join(self._parts), self.size)
+        self._parts = []
+
+
+class ResponseArchive:
+    """
+    Appends response records to an archive file, safe to share between threads.
+
+    Args:
+        path: Archive file; created if missing, otherwise appended to
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self.body_bytes = 0
+        self.stored_bytes = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    def record(self, payload: dict, status: int = 200, cached: bool = False) -> ArchiveRecord:
+        """
+        Start archiving a response whose body arrives in chunks (see ArchiveRecord).
+        """
+        return ArchiveRecord(self, payload, status, cached)
+
+    def add(self, payload: dict, body: bytes, status: int = 200, cached: bool = False):
+        """
+        Archive a complete response body.
+        """
+        record = self.record(payload, status, cached)
+        record.write(body)
+        record.commit()
+
+    def _append(self, member: bytes, body_size: int):
+        with self._lock:
+            self._file.write(member)
+            self._file.flush()
+            self.records += 1
+            self.body_bytes += body_size
+            self.stored_bytes += len(member)
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+
+    def summary(self) -> str:
+        ratio = self.body_bytes / self.stored_bytes if self.stored_bytes else 0
+        return (f"{self.records} responses archived to {self.path} "
+                f"({self.stored_bytes / (1024 * 1024):.1f} MB, {ratio:.1f}x compression)")
+
+
+def _resync(f, start: int) -> bool:
+    """
+    Move `f` to the next gzip member header after offset `start`.
+    Returns False if there is none.
+    """
+    position = start + 1
+    f.seek(position)
+    tail = b""
+    while True:
+        chunk = f.read(READ_CHUNK_SIZE)
+        if not chunk:
+            return False
+        data = tail + chunk
+        found = data.find(GZIP_MAGIC)
+        if found >= 0:
+            f.seek(position - len(tail) + found)
+            return True
+        position += len(chunk)
+        tail = data[-(len(GZIP_MAGIC) - 1):]
+
+
+def iter_records(path: str, stats: dict = None):
+    """
+    Yield (header, body) for each record of an archive, oldest first.
+
+    A damaged record (e.g. a write cut short by a crash, later appended to)
+    is skipped and reading resumes at the next record; a torn last record
+    is dropped.
+
+    Args:
+        path: Archive file
+        stats: Optional dict; its 'damaged' entry is set to the number of
+            records that could not be read
+    """
+    damaged = 0
+    resyncing = False
+    with open(path, "rb") as f:
+        buffer = b""
+        offset = 0
+        while True:
+            if not buffer:
+                buffer = f.read(READ_CHUNK_SIZE)
+                if not buffer:
+                    break
+            start = offset
+            decompressor = zlib.decompressobj(GZIP_WBITS)
+            parts = []
+            try:
+                while True:
+                    parts.append(decompressor.decompress(buffer))
+                    if decompressor.eof:
+                        offset += len(buffer) - len(decompressor.unused_data)
+                        buffer = decompressor.unused_data
+                        break
+                    offset += len(buffer)
+                    buffer = f.read(READ_CHUNK_SIZE)
+                    if not buffer:
+                        raise zlib.error("truncated record")
+            except zlib.error:
+                # A false header match inside damaged data is the same damage
+                if not resyncing:
+                    damaged += 1
+                resyncing = True
+                if not _resync(f, start):
+                    break
+                offset = f.tell()
+                buffer = b""
+                continue
+
+            resyncing = False
+            data = b"".join(parts)
+            newline = data.find(b"\n")
+            yield json.loads(data[:newline]), data[newline + 1:]
+
+    if stats is not None:
+        stats["damaged"] = damaged
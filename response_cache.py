@@ -0,0 +1,153 @@
+"""
+On-disk cache for GraphQL responses.
+
+Responses are stored in a SQLite file, keyed by a hash of the query and its
+variables. Entries expire after a per-query TTL and the least recently used
+entries are evicted once the cache grows past its size limit.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+
+# Default cache location, relative to the working directory
+DEFAULT_CACHE_DIR = ".ra_cache"
+
+# Seconds a cached response stays valid when its query has no TTL of its own
+DEFAULT_TTL = 15 * 60
+
+# Per-query TTLs by operation name. Past events rarely change, upcoming ones do.
+QUERY_TTLS = {
+    "GET_VENUE_UPCOMING": 15 * 60,
+    "GET_VENUE_PAST": 24 * 60 * 60,
+}
+
+# Total size of cached bodies before LRU eviction kicks in
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+OPERATION_NAME_RE = re.compile(r"\b(?:query|mutation)\s+(\w+)")
+
+
+def operation_name(query: str) -> str:
+    """
+    Return the operation name of a GraphQL document, or "" if it has none.
+    """
+    match = OPERATION_NAME_RE.search(query or "")
+    return match.group(1) if match else ""
+
+
+def cache_key(payload: dict) -> str:
+    """
+    Content address of a request: SHA-256 of the query and its variables.
+    Whitespace in the query and the order of variables don't change the key.
+    """
+    query = " ".join((payload.get("query") or "").split())
+    variables = json.dumps(payload.get("variables") or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{query}\n{variables}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache, safe to share between threads.
+
+    Args:
+        cache_dir: Directory holding the cache database
+        default_ttl: TTL in seconds for queries not listed in `ttls`
+        ttls: Per-operation TTLs in seconds (defaults to QUERY_TTLS)
+        max_bytes: Size limit for cached bodies; least recently used entries are evicted
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, default_ttl: float = DEFAULT_TTL,
+                 ttls: dict = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite")
+        self.default_ttl = default_ttl
+        self.ttls = dict(QUERY_TTLS if ttls is None else ttls)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                operation TEXT,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def ttl_for(self, payload: dict) -> float:
+        return self.ttls.get(operation_name(payload.get("query")), self.default_ttl)
+
+    def get(self, payload: dict):
+        """
+        Return the cached response body (bytes) for a payload, or None on a miss.
+        """
+        key = cache_key(payload)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return bytes(row[0])
+
+    def put(self, payload: dict, body: bytes):
+        """
+        Store a response body and evict old entries if the cache is over its size limit.
+        """
+        ttl = self.ttl_for(payload)
+        if ttl <= 0:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, operation, body, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(payload), operation_name(payload.get("query")), body, len(body), now + ttl, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk entries from least to most recently used until enough space is freed
+        excess = total - self.max_bytes
+        doomed = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def summary(self) -> str:
+        return f"{self.hits} cache hits, {self.misses} misses"
@@ -0,0 +1,75 @@
+import argparse
+import os
+import sys
+import database
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Search events in the SQLite database"
+    )
+    parser.add_argument(
+        "query",
+        help="Words to search for in titles, performers and descriptions"
+    )
+    parser.add_argument(
+        "--db",
+        default="events.db",
+        help="SQLite database path (default: events.db)"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum number of results (default: 20)"
+    )
+    parser.add_argument(
+        "--upcoming",
+        action="store_true",
+        help="Only show events from today on"
+    )
+    parser.add_argument(
+        "--venue",
+        help="Only show events at this venue (name or RA venue ID)"
+    )
+    parser.add_argument(
+        "--raw",
+        action="store_true",
+        help="Pass the query to SQLite FTS5 as is (supports OR, NOT, NEAR, \"phrases\")"
+    )
+    parser.add_argument(
+        "--artist",
+        action="store_true",
+        help="Treat the query as an exact artist name or RA artist ID instead"
+    )
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: database '{args.db}' not found.")
+        sys.exit(1)
+
+    if args.artist:
+        events = database.find_events_by_artist(args.db, args.query, upcoming_only=args.upcoming)
+        for event in events[:args.limit]:
+            print(f"{(event['date'] or '')[:10]}  {event['venue']}  {event['title']}")
+            print(f"    {event['url']}")
+        print(f"{len(events)} events")
+        return
+
+    try:
+        results = database.search_events(
+            args.db, args.query, limit=args.limit, upcoming_only=args.upcoming,
+            venue=args.venue, raw=args.raw
+        )
+    except Exception as e:
+        print(f"Error searching events: {e}")
+        sys.exit(1)
+
+    for result in results:
+        print(f"{(result['date'] or '')[:10]}  {result['venue']}  {result['title']}")
+        print(f"    {result['snippet']}")
+        print(f"    {result['url']}")
+    print(f"{len(results)} results")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Stdlib writers for Event records (CSV, JSON and JSON Lines).
+
+These back the scraper's command line so a scrape-and-save run never has to
+import pandas. Parquet and Feather output is handed off to columnar.py.
+Columns are in Event.FIELDS order, with empty values for missing fields in
+CSV and null in JSON. Artists are a JSON-encoded string in CSV (as in the
+DataFrame path) but a real list of {"id", "name"} objects in JSON.
+"""
+
+import csv
+import hashlib
+import json
+import os
+
+import columnar
+from models import Event
+
+
+def sort_events(events) -> list:
+    """
+    Return events sorted by date, newest first. Events without a date go last.
+    """
+    return sorted(events, key=lambda event: event.date or "", reverse=True)
+
+
+def write_csv(events, path: str) -> int:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(Event.FIELDS)
+        count = 0
+        for event in events:
+            writer.writerow(event.as_row())
+            count += 1
+    return count
+
+
+def write_json(events, path: str) -> int:
+    records = [event.as_dict() for event in events]
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(records, f, indent=2)
+    return len(records)
+
+
+def write_jsonl(events, path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for event in events:
+            f.write(json.dumps(event.as_dict()))
+            f.write("\n")
+            count += 1
+    return count
+
+
+class JsonlWriter:
+    """
+    Writes events to a JSON Lines file one line at a time, as they are parsed,
+    so downstream tools can tail the file while a crawl runs.
+
+    With append=True, events already in the file are skipped. Their ids are
+    kept in a sidecar index (`<path>.idx`) of 8-byte BLAKE2b digests, so
+    checking for duplicates never re-reads the JSON. Each line is written
+    before its digest; on open, a torn last line is cut off and an index that
+    doesn't match the file's line count is rebuilt, so a crawl killed
+    mid-write can simply be restarted with --append.
+
+    Args:
+        path: Output .jsonl file
+        append: Keep the existing file and skip events whose event_id is in it
+        checkpoint_every: Flush and fsync both files after this many events
+    """
+
+    DIGEST_SIZE = 8
+
+    def __init__(self, path: str, append: bool = False, checkpoint_every: int = 500):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.checkpoint_every = checkpoint_every
+        self.written = 0
+        self.skipped = 0
+        self._seen = set()
+        self._pending = 0
+
+        if append and os.path.exists(path):
+            self._recover()
+            self._file = open(path, "ab")
+            self._index = open(self.index_path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._index = open(self.index_path, "wb")
+
+    @classmethod
+    def digest(cls, event_id) -> bytes:
+        return hashlib.blake2b(str(event_id).encode(), digest_size=cls.DIGEST_SIZE).digest()
+
+    def _recover(self):
+        # Drop a partial last line left by an interrupted write
+        with open(self.path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            torn = False
+            if end:
+                f.seek(end - 1)
+                torn = f.read(1) != b"\n"
+            if torn:
+                keep = 0
+                position = end
+                while position > 0:
+                    step = min(64 * 1024, position)
+                    f.seek(position - step)
+                    newline = f.read(step).rfind(b"\n")
+                    if newline >= 0:
+                        keep = position - step + newline + 1
+                        break
+                    position -= step
+                f.truncate(keep)
+            f.seek(0)
+            lines = sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1024 * 1024), b""))
+
+        index = b""
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                index = f.read()
+        if len(index) == lines * self.DIGEST_SIZE:
+            self._seen = {index[i:i + self.DIGEST_SIZE] for i in range(0, len(index), self.DIGEST_SIZE)}
+            return
+
+        # Index missing or out of step with the file: rebuild it from the lines
+        digests = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                digests.append(self.digest(json.loads(line).get("event_id")))
+        with open(self.index_path, "wb") as f:
+            f.write(b"".join(digests))
+        self._seen = set(digests)
+
+    def write(self, event) -> bool:
+        """
+        Append one event. Returns False if its event_id is already in the file.
+        """
+        key = self.digest(event.event_id)
+        if key in self._seen:
+            self.skipped += 1
+            return False
+        self._file.write(json.dumps(event.as_dict()).encode())
+        self._file.write(b"\n")
+        self._index.write(key)
+        self._seen.add(key)
+        self.written += 1
+        self._pending += 1
+        if self._pending >= self.checkpoint_every:
+            self.checkpoint()
+        return True
+
+    def tee(self, events):
+        """
+        Write each event as it passes through and yield it on (e.g. to the database).
+        """
+        for event in events:
+            self.write(event)
+            yield event
+
+    def checkpoint(self):
+        """
+        Make everything written so far durable: data first, then the index.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._index.flush()
+        os.fsync(self._index.fileno())
+        self._pending = 0
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.checkpoint()
+        self._file.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_events(events, path: str) -> int:
+    """
+    Write events to a file, picking the format from its extension
+    (.json, .jsonl, .parquet, .feather/.arrow, anything else is CSV).
+    Parquet and Feather need pyarrow (see columnar.py).
+
+    Returns:
+        Number of events written
+    """
+    if path.endswith(columnar.PARQUET_EXTENSIONS):
+        return columnar.write_parquet(events, path)
+    if path.endswith(columnar.FEATHER_EXTENSIONS):
+        return columnar.write_feather(events, path)
+    if path.endswith(".jsonl"):
+        return write_jsonl(events, path)
+    if path.endswith(".json"):
+        return write_json(events, path)
+    return write_csv(events, path)
+
+
+def format_sample(events, columns=("date", "title", "performers"), limit: int = 5) -> str:
+    """
+    Render the first few events as a plain-text table for console output.
+    """
+    rows = [[str(getattr(event, column) or "") for column in columns] for event in events[:limit]]
+    widths = [max([len(column)] + [len(row[i]) for row in rows]) for i, column in enumerate(columns)]
+    lines = ["  ".join(column.ljust(width) for column, width in zip(columns, widths))]
+    lines += ["  ".join(value.ljust(width) for value, width in zip(row, widths)) for row in rows]
+    return "\n".join(line.rstrip() for line in lines)